@@ -46,6 +46,7 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -65,6 +66,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'gcms_sitehub.context_processors.footer_gallery',
             ],
         },
     },
@@ -77,13 +79,63 @@ WSGI_APPLICATION = 'gcms_portal.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# WAL lets page reads carry on while a form submission is being written;
+# writers take the lock up front (BEGIN IMMEDIATE) and wait up to `timeout`
+# seconds for it instead of failing with "database is locked".
+SQLITE_OPTIONS = {
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA mmap_size=134217728;'
+        'PRAGMA cache_size=-20000;'
+        'PRAGMA temp_store=MEMORY;'
+    ),
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': 20,
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
+    },
+    # Contact messages, online applications and visit requests; see
+    # gcms_sitehub.routers. Create or update it with
+    #   python manage.py migrate --database=submissions
+    # and move rows written before the split with `copy_submissions`.
+    'submissions': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'submissions.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
+    },
+}
+
+DATABASE_ROUTERS = ['gcms_sitehub.routers.SubmissionsRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Page-cache invalidation bumps version counters in this cache, so every worker
+# process must share it: the file cache is shared by the workers of one host.
+# Sites served from several hosts should use Redis or Memcached instead.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
     }
 }
 
+# Serve anonymous GETs of public pages from the cache (see gcms_sitehub.caching).
+# A per-process cache (LocMemCache) would leave other workers serving stale
+# pages after an edit, so it turns the page cache off.
+PAGE_CACHE_ENABLED = not DEBUG and not CACHES['default']['BACKEND'].endswith('.LocMemCache')
+
+# Longest a cached page is kept, in seconds, however it was invalidated.
+PAGE_CACHE_TIMEOUT = 60 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -128,6 +180,36 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# Uploaded images are auto-oriented, stripped of metadata and capped to
+# IMAGE_UPLOAD_MAX_EDGE pixels as they are saved (see gcms_sitehub.storage).
+STORAGES = {
+    'default': {
+        'BACKEND': 'gcms_sitehub.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'gcms_sitehub.storage.BundledManifestStaticFilesStorage',
+    },
+}
+IMAGE_UPLOAD_MAX_EDGE = 2560
+
+# Load the collectstatic-built bundles from gcms_sitehub.assets instead of the
+# individual source files (see {% bundle %}); requires `collectstatic`.
+STATIC_BUNDLES_ENABLED = not DEBUG
+
+# How /downloads/ hands file bodies to the web server: None streams them from
+# Django, 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache/lighttpd) only
+# checks the request and lets the server send the file. For nginx, map
+# DOWNLOAD_ACCEL_PREFIX onto MEDIA_ROOT:
+#     location /protected-media/ { internal; alias /path/to/media/; }
+DOWNLOAD_OFFLOAD = None
+DOWNLOAD_ACCEL_PREFIX = '/protected-media/'
+
+# Contact messages and online applications are written in batches by a
+# background thread (gcms_sitehub.writers). Each submission is first appended
+# to a spool file here, so a crashed worker loses nothing; None keeps queued
+# submissions in memory only.
+SUBMISSION_SPOOL_DIR = BASE_DIR / 'spool'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -19,6 +19,8 @@ from django.urls import path , include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from gcms_sitehub.views import serve_media
+
 
 
 urlpatterns = [
@@ -27,6 +29,6 @@ urlpatterns = [
 ]
 
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
 
 
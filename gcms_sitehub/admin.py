@@ -1,4 +1,7 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.core.exceptions import ValidationError
+from django.template.response import TemplateResponse
 
 # ============================ Model Imports ============================
 from .models import (
@@ -7,7 +10,21 @@ from .models import (
     Exam, ExamResult, Facility, FeeStructure, HighlightSection,
     HostelFacility, HostelIntro, LibraryBook, News, PhilosophyBlock, Rule,
     Statistic, Testimonial, FacultyMember, GalleryImage, OnlineApplication, 
+    StudentResult,
 )
+from .exports import StreamingExportMixin
+from .forms import PublishResultsForm
+from .pagination import EstimatedCountPaginator
+from .publishing import publish_results
+from .results import ingest_result_sheet
+
+
+# ============================ Large Tables ============================
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist for tables that grow without bound: no exact COUNT(*) over the whole table."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
 
 # ============================ Gallery ============================
 admin.site.register(GalleryImage)
@@ -18,6 +35,7 @@ class EventAdmin(admin.ModelAdmin):
     list_display = ['title', 'date', 'venue']
     search_fields = ['title', 'venue']
     list_filter = ['date']
+    date_hierarchy = 'date'
 
 # ============================ Department ============================
 @admin.register(Department)
@@ -32,6 +50,8 @@ class FacultyMemberAdmin(admin.ModelAdmin):
     list_display = ('name', 'subject', 'department')
     search_fields = ('name', 'subject', 'department__name')
     list_filter = ('department',)
+    list_select_related = ('department',)
+    autocomplete_fields = ('department',)
 
 # ============================ Admission ============================
 @admin.register(Admission)
@@ -47,8 +67,12 @@ class ContactInformationAdmin(admin.ModelAdmin):
 
 # ============================ Contact Messages ============================
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(StreamingExportMixin, LargeTableAdmin):
     list_display = ('name', 'email', 'subject', 'date_sent')
+    search_fields = ('name', 'email', 'subject')
+    date_hierarchy = 'date_sent'
+    ordering = ('-date_sent',)
+    export_fields = ('name', 'email', 'phone', 'subject', 'message', 'date_sent')
 
 # ============================ Rules ============================
 @admin.register(Rule)
@@ -58,8 +82,81 @@ class RuleAdmin(admin.ModelAdmin):
     ordering = ['order']
 
 # ============================ Exams ============================
-admin.site.register(Exam)
-admin.site.register(ExamResult)
+@admin.register(Exam)
+class ExamAdmin(LargeTableAdmin):
+    list_display = ('title', 'department', 'start_date', 'end_date', 'status')
+    search_fields = ('title', 'department__name')
+    list_filter = ('status',)
+    list_select_related = ('department',)
+    autocomplete_fields = ('department',)
+    date_hierarchy = 'start_date'
+    ordering = ('-start_date',)
+
+    def get_queryset(self, request):
+        # Autocomplete results for ExamResult.exam render Exam.__str__ too.
+        return super().get_queryset(request).select_related('department')
+
+    actions = ['publish_exam_results']
+
+    def has_publish_results_permission(self, request):
+        return request.user.has_perm('gcms_sitehub.add_examresult')
+
+    @admin.action(description='Publish results for the selected exams', permissions=['publish_results'])
+    def publish_exam_results(self, request, queryset):
+        form = PublishResultsForm(request.POST if 'apply' in request.POST else None)
+        if not form.is_valid():
+            return TemplateResponse(request, 'admin/gcms_sitehub/publish_results.html', {
+                **self.admin_site.each_context(request),
+                'title': 'Publish results',
+                'opts': self.model._meta,
+                'form': form,
+                'exams': queryset,
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            })
+
+        exams = list(queryset)
+        report = publish_results([{'exam': exam, **form.cleaned_data} for exam in exams])
+        for message in report.error_messages({index: str(exam) for index, exam in enumerate(exams)}):
+            self.message_user(request, message, messages.ERROR)
+        if report.ok:
+            self.message_user(request, f'Published {len(report.created)} result(s).', messages.SUCCESS)
+        else:
+            self.message_user(request, 'Nothing was published; fix the exams above and try again.', messages.WARNING)
+
+
+@admin.register(ExamResult)
+class ExamResultAdmin(LargeTableAdmin):
+    list_display = ('exam', 'status', 'release_date', 'progress')
+    search_fields = ('exam__title',)
+    list_filter = ('status',)
+    # Exam.__str__ reads the department name.
+    list_select_related = ('exam__department',)
+    autocomplete_fields = ('exam',)
+    date_hierarchy = 'release_date'
+    ordering = ('-release_date',)
+    actions = ['ingest_result_sheets']
+
+    @admin.action(description='Load student marks from the result sheet')
+    def ingest_result_sheets(self, request, queryset):
+        for result in queryset.select_related('exam__department'):
+            try:
+                created, skipped = ingest_result_sheet(result)
+            except ValidationError as error:
+                self.message_user(request, f'{result}: {" ".join(error.messages)}', messages.ERROR)
+                continue
+            self.message_user(request, f'{result}: {created} student result(s) loaded.', messages.SUCCESS)
+            for problem in skipped[:20]:
+                self.message_user(request, f'{result}: {problem}', messages.WARNING)
+            if len(skipped) > 20:
+                self.message_user(request, f'{result}: {len(skipped) - 20} more row(s) skipped.', messages.WARNING)
+
+
+@admin.register(StudentResult)
+class StudentResultAdmin(LargeTableAdmin):
+    list_display = ('roll_number', 'student_name', 'result')
+    search_fields = ('=roll_number', 'student_name')
+    list_select_related = ('result__exam__department',)
+    raw_id_fields = ('result',)
 
 # ============================ About Page Static Sections ============================
 admin.site.register(PhilosophyBlock)
@@ -73,11 +170,14 @@ admin.site.register(ApplicationDownload)
 
 # ============================ Online Application ============================
 @admin.register(OnlineApplication)
-class OnlineApplicationAdmin(admin.ModelAdmin):
+class OnlineApplicationAdmin(StreamingExportMixin, LargeTableAdmin):
     list_display = ('full_name', 'email', 'phone', 'program', 'previous_institute', 'year_completed', 'created_at')
     search_fields = ('full_name', 'email', 'program', 'previous_institute')
-    list_filter = ('program', 'year_completed', 'created_at')
+    list_filter = ('intake', 'program', 'year_completed', 'superseded')
+    date_hierarchy = 'created_at'
     ordering = ('-created_at',)
+    export_fields = ('full_name', 'email', 'phone', 'address', 'program',
+                     'previous_institute', 'year_completed', 'intake', 'superseded', 'created_at')
 
 
 # ============================ Facilities & Hostel ============================
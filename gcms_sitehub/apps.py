@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GcmsSitehubConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gcms_sitehub'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,160 @@
+import gzip
+import posixpath
+import re
+
+from django.contrib.staticfiles import finders
+
+# Both are in requirements.txt. Without brotli only .gz siblings are written;
+# without rjsmin scripts are concatenated as-is (most are minified upstream).
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+
+# ============================ Bundle Definitions ============================
+
+# Output name -> source files, in load order. Paths are relative to the
+# static root, like the {% static %} arguments they replace.
+BUNDLES = {
+    'bundles/site.css': [
+        'assets/css/assets.css',
+        'assets/css/typography.css',
+        'assets/css/shortcodes/shortcodes.css',
+        'assets/css/style.css',
+    ],
+    'bundles/revolution.css': [
+        'assets/vendors/revolution/css/layers.css',
+        'assets/vendors/revolution/css/settings.css',
+        'assets/vendors/revolution/css/navigation.css',
+    ],
+    'bundles/site.js': [
+        'assets/js/jquery.min.js',
+        'assets/vendors/bootstrap/js/popper.min.js',
+        'assets/vendors/bootstrap/js/bootstrap.min.js',
+        'assets/vendors/bootstrap-select/bootstrap-select.min.js',
+        'assets/vendors/bootstrap-touchspin/jquery.bootstrap-touchspin.js',
+        'assets/vendors/magnific-popup/magnific-popup.js',
+        'assets/vendors/counter/waypoints-min.js',
+        'assets/vendors/counter/counterup.min.js',
+        'assets/vendors/imagesloaded/imagesloaded.js',
+        'assets/vendors/masonry/masonry.js',
+        'assets/vendors/masonry/filter.js',
+        'assets/vendors/owl-carousel/owl.carousel.js',
+        'assets/js/functions.js',
+        'assets/js/contact.js',
+        'assets/vendors/switcher/switcher.js',
+    ],
+    'bundles/revolution.js': [
+        'assets/vendors/revolution/js/jquery.themepunch.tools.min.js',
+        'assets/vendors/revolution/js/jquery.themepunch.revolution.min.js',
+    ] + [
+        f'assets/vendors/revolution/js/extensions/revolution.extension.{extension}.min.js'
+        for extension in (
+            'actions', 'carousel', 'kenburn', 'layeranimation', 'migration',
+            'navigation', 'parallax', 'slideanims', 'video',
+        )
+    ],
+}
+
+# Extensions worth precompressing; images and fonts are already compressed.
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.map', '.txt', '.xml', '.eot', '.ttf')
+
+
+# ============================ CSS ============================
+
+_CSS_IMPORT = re.compile(r'''@import\s+(?:url\()?\s*(['"]?)([^'")\s]+)\1\s*\)?\s*([^;]*);''')
+_CSS_CHARSET = re.compile(r'@charset\s+[^;]+;')
+_CSS_URL = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+_CSS_STRINGS = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+_CSS_TOKENS = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|(\s+)''', re.DOTALL)
+
+
+def _is_external(url):
+    return url.startswith(('http:', 'https:', '//', 'data:', '#', '/'))
+
+
+def _read_static(path):
+    absolute = finders.find(path)
+    if absolute is None:
+        raise FileNotFoundError(f'Static file {path!r} listed in a bundle was not found.')
+    with open(absolute, encoding='utf-8', errors='surrogateescape') as handle:
+        return handle.read()
+
+
+def _inline_css(path, target, external_imports, seen):
+    """Return the CSS of ``path`` with local @imports inlined and url()s rebased onto ``target``."""
+    if path in seen:
+        return ''
+    seen.add(path)
+    directory = posixpath.dirname(path)
+    css = _read_static(path)
+
+    def rebase(match):
+        quote, url = match.groups()
+        if _is_external(url):
+            return match.group(0)
+        resolved = posixpath.normpath(posixpath.join(directory, url))
+        return f'url({quote}{posixpath.relpath(resolved, posixpath.dirname(target))}{quote})'
+
+    inlined = []
+
+    def inline(match):
+        _, url, media = match.groups()
+        if _is_external(url):
+            # @import must precede every rule, so remote imports move to the top.
+            external_imports.append(match.group(0))
+            return ''
+        imported = _inline_css(posixpath.normpath(posixpath.join(directory, url)), target, external_imports, seen)
+        inlined.append(f'@media {media.strip()} {{{imported}}}' if media.strip() else imported)
+        return f'\x00{len(inlined) - 1}\x00'
+
+    css = _CSS_CHARSET.sub('', css)
+    # Imports become placeholders first so only this file's own url()s are rebased.
+    css = _CSS_URL.sub(rebase, _CSS_IMPORT.sub(inline, css))
+    return re.sub('\x00(\\d+)\x00', lambda match: inlined[int(match.group(1))], css)
+
+
+def minify_css(css):
+    """Drop comments and collapse whitespace, leaving strings untouched."""
+    def token(match):
+        string, comment, space = match.groups()
+        if string:
+            return string
+        return '' if comment else ' '
+
+    pieces = _CSS_STRINGS.split(_CSS_TOKENS.sub(token, css))
+    # Odd pieces are the string literals the split kept.
+    for index in range(0, len(pieces), 2):
+        pieces[index] = re.sub(r'\s*([{};,>])\s*', r'\1', pieces[index]).replace(';}', '}')
+    return ''.join(pieces).strip()
+
+
+# ============================ Building ============================
+
+def build_bundle(name):
+    """Return the concatenated, minified contents of bundle ``name``."""
+    sources = BUNDLES[name]
+    if name.endswith('.css'):
+        external_imports, seen = [], set()
+        body = '\n'.join(_inline_css(path, name, external_imports, seen) for path in sources)
+        return minify_css('\n'.join(external_imports) + '\n' + body)
+
+    parts = [_read_static(path) for path in sources]
+    if rjsmin is not None:
+        parts = [rjsmin.jsmin(part) for part in parts]
+    # A file without a trailing semicolon must not run into the next one.
+    return '\n;'.join(part.strip() for part in parts) + '\n'
+
+
+def compress(content):
+    """Return ``{'.gz': bytes, '.br': bytes}`` for ``content``, skipping unavailable codecs."""
+    siblings = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        siblings['.br'] = brotli.compress(content, quality=11)
+    return siblings
@@ -0,0 +1,195 @@
+import datetime
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .models import GalleryImage
+
+
+# ============================ Model Versions ============================
+
+def _version_key(model):
+    return f'gcms_sitehub:version:{model._meta.label_lower}'
+
+
+def get_model_versions(models):
+    """Return the current version counter of each model, fetched in one cache round trip."""
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A fresh, time-based seed keeps evicted counters from colliding with old pages.
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model):
+    """Invalidate every cached page that depends on ``model``."""
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+# ============================ Footer Gallery ============================
+
+FOOTER_GALLERY_CACHE_KEY = 'gcms_sitehub:footer_gallery'
+FOOTER_GALLERY_LIMIT = 8
+
+
+def get_footer_gallery():
+    """
+    Return the capped list of footer gallery images, cached until a
+    GalleryImage changes or for PAGE_CACHE_TIMEOUT, whichever is sooner.
+    """
+    images = cache.get(FOOTER_GALLERY_CACHE_KEY)
+    if images is None:
+        images = list(GalleryImage.objects.order_by('-id')[:FOOTER_GALLERY_LIMIT])
+        cache.set(FOOTER_GALLERY_CACHE_KEY, images, capped_timeout())
+    return images
+
+
+def invalidate_footer_gallery():
+    """Drop the cached footer gallery so the next render reloads it."""
+    cache.delete(FOOTER_GALLERY_CACHE_KEY)
+
+
+# ============================ Page Cache ============================
+
+def seconds_until_local_midnight():
+    """Timeout for pages whose content depends on the current local date."""
+    now = timezone.localtime()
+    midnight = timezone.make_aware(
+        datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time.min)
+    )
+    return max(1, int((midnight - now).total_seconds()) + 1)
+
+
+def capped_timeout(timeout=None):
+    """``timeout``, shortened to PAGE_CACHE_TIMEOUT when that is set."""
+    limit = getattr(settings, 'PAGE_CACHE_TIMEOUT', None)
+    if limit is None:
+        return timeout
+    return limit if timeout is None else min(timeout, limit)
+
+
+def _is_cacheable_request(request):
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', False) or request.method != 'GET':
+        return False
+    # Visitors with a session or pending messages get personalised pages.
+    return not any(
+        name in request.COOKIES
+        for name in (settings.SESSION_COOKIE_NAME, 'messages')
+    )
+
+
+def _is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def page_cache_key(request, models):
+    versions = '.'.join(str(version) for version in get_model_versions(models))
+    digest = hashlib.md5(f'{request.build_absolute_uri()}|{versions}'.encode()).hexdigest()
+    return f'gcms_sitehub:page:{digest}'
+
+
+def cache_public_page(*models, timeout=None):
+    """
+    Cache the rendered response of an anonymous GET per URL and query string.
+
+    Entries are keyed on the version counters of ``models`` (plus GalleryImage,
+    which every page shows in its footer), so saving or deleting any of them
+    retires the page. ``timeout`` may be a number of seconds or a callable
+    returning one; either way an entry lives at most PAGE_CACHE_TIMEOUT
+    seconds. Works on both sync and async views.
+    """
+    dependencies = (GalleryImage,) + models
+
+    def _lookup(request):
+        key = page_cache_key(request, dependencies)
+        return key, cache.get(key)
+
+    def _store(request, key, response):
+        if _is_cacheable_response(request, response):
+            cache.set(key, response, capped_timeout(timeout() if callable(timeout) else timeout))
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_view(request, *args, **kwargs):
+                if not _is_cacheable_request(request):
+                    return await view_func(request, *args, **kwargs)
+
+                key, response = await sync_to_async(_lookup)(request)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    await sync_to_async(_store)(request, key, response)
+                return response
+            return _wrapped_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if not _is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+
+            key, response = _lookup(request)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                _store(request, key, response)
+            return response
+        return _wrapped_view
+    return decorator
+
+
+# ============================ Conditional GET ============================
+
+def conditional_page(model, lookup_field, *models):
+    """
+    Answer If-None-Match / If-Modified-Since for a detail view before it renders.
+
+    The object is looked up by ``lookup_field`` (also the name of the view's URL
+    kwarg) and only its pk and ``updated_at`` are read, once per request, to build
+    both validators. The ETag also folds in the version counters of ``models``
+    and GalleryImage, so related content and the footer retire it too. Related
+    rows have no modification time to offer, so when ``models`` is given only
+    the ETag is sent.
+    """
+    dependencies = (GalleryImage,) + models
+
+    def _validators(request, **kwargs):
+        if not hasattr(request, '_gcms_validators'):
+            row = (
+                model.objects.filter(**{lookup_field: kwargs[lookup_field]})
+                .values_list('pk', 'updated_at')
+                .first()
+            )
+            if row is None:
+                request._gcms_validators = (None, None)
+            else:
+                pk, updated_at = row
+                versions = '.'.join(str(version) for version in get_model_versions(dependencies))
+                tag = f'{model._meta.label_lower}:{pk}:{updated_at.isoformat()}:{versions}'
+                request._gcms_validators = (hashlib.md5(tag.encode()).hexdigest(), updated_at)
+        return request._gcms_validators
+
+    def _last_modified(request, *args, **kwargs):
+        return _validators(request, **kwargs)[1]
+
+    return condition(
+        etag_func=lambda request, *args, **kwargs: _validators(request, **kwargs)[0],
+        # If-Modified-Since alone would keep answering 304 after a related row changed.
+        last_modified_func=None if models else _last_modified,
+    )
@@ -0,0 +1,6 @@
+from .caching import get_footer_gallery
+
+
+def footer_gallery(request):
+    """Expose the cached footer gallery to every template as ``footer_images``."""
+    return {'footer_images': get_footer_gallery()}
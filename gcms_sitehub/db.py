@@ -0,0 +1,38 @@
+import time
+from functools import wraps
+
+from django.db import OperationalError, connections, transaction
+
+# Attempts, and the first back-off in seconds (doubled each retry), for a
+# write that still finds the database locked after the busy timeout.
+LOCKED_RETRY_ATTEMPTS = 3
+LOCKED_RETRY_BACKOFF = 0.2
+
+
+def _is_locked(error):
+    return 'database is locked' in str(error) or 'database table is locked' in str(error)
+
+
+def atomic_with_retry(func=None, *, using='default', attempts=LOCKED_RETRY_ATTEMPTS):
+    """
+    Run ``func`` in its own write transaction, retrying a bounded number of
+    times if SQLite still reports the database as locked.
+
+    The transaction is only retried when it is the outermost one; inside an
+    enclosing atomic() block the error is raised so the caller can roll back.
+    """
+    def decorator(func):
+        @wraps(func)
+        def _wrapped(*args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    with transaction.atomic(using=using):
+                        return func(*args, **kwargs)
+                except OperationalError as error:
+                    last_attempt = attempt == attempts - 1
+                    if last_attempt or not _is_locked(error) or connections[using].in_atomic_block:
+                        raise
+                    time.sleep(LOCKED_RETRY_BACKOFF * 2 ** attempt)
+        return _wrapped
+
+    return decorator(func) if func is not None else decorator
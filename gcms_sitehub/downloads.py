@@ -0,0 +1,119 @@
+import hashlib
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+
+# Bytes read per chunk when Django itself streams part of a file.
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+# ============================ Validators ============================
+
+def file_etag(name, size, mtime):
+    """Strong ETag for a stored file; changes whenever its name, size or mtime does."""
+    return '"%s"' % hashlib.md5(f'{name}:{size}:{mtime}'.encode()).hexdigest()
+
+
+def parse_range(header, size):
+    """
+    Return the inclusive ``(start, end)`` byte span asked for by a Range header,
+    or None to send the whole file (absent, malformed or multi-range requests).
+    """
+    match = _RANGE.match((header or '').strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # "bytes=-N": the final N bytes.
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def _iter_span(path, start, end):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+# ============================ Serving ============================
+
+def serve_download(request, name, filename):
+    """
+    Answer a GET/HEAD for the stored file ``name``, offered as ``filename``.
+
+    Handles If-None-Match / If-Modified-Since (304) and single byte ranges
+    (206 / 416, honouring If-Range). With ``DOWNLOAD_OFFLOAD`` set to
+    ``'x-accel-redirect'`` (nginx) or ``'x-sendfile'`` (Apache, lighttpd) the
+    body is left to the web server, which then also serves ranges itself;
+    otherwise whole files go out through FileResponse, which uses the WSGI
+    server's sendfile wrapper when it has one.
+    """
+    path = default_storage.path(name)
+    stat = os.stat(path)
+    etag = file_etag(name, stat.st_size, int(stat.st_mtime))
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    offload = getattr(settings, 'DOWNLOAD_OFFLOAD', None)
+    if offload:
+        response = HttpResponse(content_type=content_type)
+        if offload == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.DOWNLOAD_ACCEL_PREFIX + quote(name)
+        else:
+            response['X-Sendfile'] = path
+    else:
+        span = None
+        if_range = request.headers.get('If-Range')
+        if if_range is None or if_range in (etag, http_date(last_modified)):
+            try:
+                span = parse_range(request.headers.get('Range'), stat.st_size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{stat.st_size}'
+                return response
+
+        if span is None:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        else:
+            start, end = span
+            response = StreamingHttpResponse(_iter_span(path, start, end), status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(end - start + 1)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
@@ -0,0 +1,215 @@
+import csv
+import datetime
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.contrib import admin
+from django.http import Http404, StreamingHttpResponse
+from django.urls import path
+from django.utils import timezone
+
+# Rows fetched from the database per round trip while streaming an export.
+EXPORT_CHUNK_SIZE = 2000
+
+# Characters XML 1.0 does not allow, which would make Excel reject the sheet.
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Leading characters that make a spreadsheet read a CSV cell as a formula.
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+# ============================ Row Formatting ============================
+
+def _export_value(value):
+    if isinstance(value, datetime.datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        return value.strftime('%Y-%m-%d %H:%M')
+    if value is None:
+        return ''
+    return value
+
+
+# ============================ CSV ============================
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    value = _export_value(value)
+    # Visitors fill these fields in; a leading quote keeps "=HYPERLINK(...)" a string.
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(header, rows):
+    """Yield a CSV document line by line; the BOM lets Excel detect UTF-8."""
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+# ============================ XLSX ============================
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+
+class _ZipBuffer:
+    """Write-only, unseekable sink that zipfile streams into; drained after each chunk."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _xlsx_cell(value):
+    value = _export_value(value)
+    if isinstance(value, bool):
+        value = str(value)
+    if isinstance(value, (int, float)):
+        return f'<c><v>{value}</v></c>'
+    # Text only ever goes in inline strings, never <f>, so Excel cannot evaluate it.
+    text = escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>'
+
+
+def stream_xlsx(header, rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield a single-sheet XLSX workbook as it is written.
+
+    The zip is produced on an unseekable buffer, so each entry carries a data
+    descriptor instead of a back-patched header and nothing but the current
+    chunk of rows is ever held in memory.
+    """
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header).encode())
+            pending = 0
+            for row in rows:
+                sheet.write(_xlsx_row(row).encode())
+                pending += 1
+                if pending >= chunk_size:
+                    pending = 0
+                    yield buffer.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def export_response(queryset, fields, export_format, filename):
+    """Stream ``fields`` of every row in ``queryset`` as a CSV or XLSX download."""
+    stream, content_type = EXPORT_FORMATS[export_format]
+    opts = queryset.model._meta
+    header = [str(opts.get_field(name).verbose_name).title() for name in fields]
+    rows = queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    response = StreamingHttpResponse(stream(header, rows), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+# ============================ Admin Integration ============================
+
+class StreamingExportMixin:
+    """
+    ModelAdmin mixin adding CSV/XLSX export of ``export_fields``.
+
+    The "Export" buttons on the changelist stream every row matching the
+    current search and filters; the actions export only the selected rows.
+    """
+
+    export_fields = ()
+    change_list_template = 'admin/gcms_sitehub/export_change_list.html'
+    actions = ['export_as_csv', 'export_as_xlsx']
+
+    def _export(self, request, queryset, export_format):
+        filename = f'{self.model._meta.model_name}-{timezone.localdate():%Y%m%d}'
+        return export_response(queryset, self.export_fields, export_format, filename)
+
+    @admin.action(permissions=['view'], description='Export selected rows as CSV')
+    def export_as_csv(self, request, queryset):
+        return self._export(request, queryset, 'csv')
+
+    @admin.action(permissions=['view'], description='Export selected rows as XLSX')
+    def export_as_xlsx(self, request, queryset):
+        return self._export(request, queryset, 'xlsx')
+
+    def export_view(self, request, export_format):
+        if export_format not in EXPORT_FORMATS or not self.has_view_permission(request):
+            raise Http404
+        changelist = self.get_changelist_instance(request)
+        return self._export(request, changelist.get_queryset(request), export_format)
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                'export/<str:export_format>/',
+                self.admin_site.admin_view(self.export_view),
+                name=f'{opts.app_label}_{opts.model_name}_export',
+            ),
+        ] + super().get_urls()
@@ -1,4 +1,6 @@
 # forms.py
+import uuid
+
 from django import forms
 from .models import VisitRequest
 
@@ -22,9 +24,19 @@ class VisitRequestForm(forms.ModelForm):
 
 
 
-from .models import OnlineApplication
+from .models import ContactMessage, OnlineApplication
+
+class IdempotentModelForm(forms.ModelForm):
+    """ModelForm whose instance keeps the idempotency key rendered into the page."""
+    # Rendered once per page view; resubmitting the same page reuses it.
+    idempotency_key = forms.UUIDField(required=False, widget=forms.HiddenInput)
+
+    def save(self, commit=True):
+        self.instance.idempotency_key = self.cleaned_data.get('idempotency_key') or uuid.uuid4()
+        return super().save(commit)
+
 
-class OnlineApplicationForm(forms.ModelForm):
+class OnlineApplicationForm(IdempotentModelForm):
     class Meta:
         model = OnlineApplication
         fields = [
@@ -53,4 +65,49 @@ class OnlineApplicationForm(forms.ModelForm):
             'program': 'Program of Interest',
             'previous_institute': 'Previous Institute',
             'year_completed': 'Year of Completion',
-        }
\ No newline at end of file
+        }
+
+    def clean_email(self):
+        return self.cleaned_data['email'].lower()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        email, program = cleaned_data.get('email'), cleaned_data.get('program')
+        if email and program:
+            # The writer drops a row the unique constraint rejects, so say so now.
+            current = OnlineApplication.objects.filter(
+                email=email, program=program, intake=self.instance.intake, superseded=False,
+            ).values_list('idempotency_key', flat=True)[:1]
+            key = next(iter(current), None)
+            # A resubmitted page carries the key of the application already written.
+            if key is not None and key != cleaned_data.get('idempotency_key'):
+                raise forms.ValidationError(
+                    'An application for %(program)s from this email address has already been '
+                    'received for the %(intake)s intake.',
+                    code='duplicate',
+                    params={'program': self.instance.get_program_display(), 'intake': self.instance.intake},
+                )
+        return cleaned_data
+
+
+class ContactMessageForm(IdempotentModelForm):
+    class Meta:
+        model = ContactMessage
+        fields = ['name', 'email', 'phone', 'subject', 'message']
+
+
+from django.contrib.admin.widgets import AdminDateWidget
+
+class PublishResultsForm(forms.Form):
+    """Admin action form: the values given to the result of every selected exam."""
+    STATUS_CHOICES = [
+        ('Not Released', 'Not Released'),
+        ('Pending', 'Pending'),
+        ('Released', 'Released'),
+    ]
+
+    release_date = forms.DateField(widget=AdminDateWidget)
+    status = forms.ChoiceField(choices=STATUS_CHOICES, initial='Released')
+    access_method = forms.CharField(max_length=100, initial='Online')
+    required_info = forms.CharField(max_length=100, initial='Student ID')
+    progress = forms.IntegerField(min_value=0, max_value=100, initial=0)
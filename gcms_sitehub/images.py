@@ -0,0 +1,135 @@
+import hashlib
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.utils.functional import LazyObject
+from PIL import Image, ImageOps
+
+from .caching import bump_model_version
+from .storage import color_profile
+
+logger = logging.getLogger(__name__)
+
+
+# ============================ Derivative Settings ============================
+
+# Widths (in px) generated for every uploaded image; larger ones are skipped
+# when the original is narrower.
+DERIVATIVE_WIDTHS = getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', (320, 640, 960, 1280))
+DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Model fields whose uploads get derivatives, as (app_label.Model, field name).
+RESPONSIVE_IMAGE_FIELDS = [
+    ('gcms_sitehub.Department', 'image'),
+    ('gcms_sitehub.News', 'image'),
+    ('gcms_sitehub.Event', 'event_image'),
+    ('gcms_sitehub.LibraryBook', 'image'),
+    ('gcms_sitehub.FacultyMember', 'image'),
+    ('gcms_sitehub.GalleryImage', 'image'),
+    ('gcms_sitehub.Testimonial', 'image'),
+]
+
+
+class DerivativeStorage(LazyObject):
+    def _setup(self):
+        self._wrapped = FileSystemStorage(
+            location=os.path.join(settings.MEDIA_ROOT, 'derivatives'),
+            base_url=f'{settings.MEDIA_URL}derivatives/',
+        )
+
+
+derivative_storage = DerivativeStorage()
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-derivatives')
+
+
+# ============================ Generation ============================
+
+def derivative_name(name, width, extension):
+    stem, _ = os.path.splitext(name)
+    return f'{stem}-{width}w.{extension}'
+
+
+def _widths_cache_key(name):
+    return f'gcms_sitehub:derivatives:{hashlib.md5(name.encode()).hexdigest()}'
+
+
+def generate_derivatives(name):
+    """Write every missing WebP/JPEG width of the stored image ``name``; return how many were written."""
+    try:
+        with default_storage.open(name) as original:
+            image = ImageOps.exif_transpose(Image.open(original))
+            image.load()
+    except (OSError, ValueError):
+        logger.warning('Could not read %s to build image derivatives.', name)
+        return 0
+
+    # Originals narrower than every target width are already small enough to serve as-is.
+    widths = tuple(width for width in DERIVATIVE_WIDTHS if width < image.width)
+    has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+    written = 0
+    for width in widths:
+        height = round(image.height * width / image.width)
+        resized = None
+        for extension, (image_format, options) in DERIVATIVE_FORMATS.items():
+            target = derivative_name(name, width, extension)
+            if derivative_storage.exists(target):
+                continue
+            if resized is None:
+                resized = image.convert('RGBA' if has_alpha else 'RGB').resize(
+                    (width, height), Image.Resampling.LANCZOS
+                )
+            variant = resized if image_format == 'WEBP' else resized.convert('RGB')
+            buffer = io.BytesIO()
+            variant.save(buffer, image_format, icc_profile=color_profile(image, variant), **options)
+            derivative_storage.save(target, ContentFile(buffer.getvalue()))
+            written += 1
+
+    cache.set(_widths_cache_key(name), widths, None)
+    return written
+
+
+def _generate_and_refresh(name, model):
+    # Names are content addresses, so derivatives already on disk were made from these very bytes.
+    if available_widths(name):
+        return
+    if generate_derivatives(name) and model is not None:
+        # Pages rendered before the derivatives existed still point at the original.
+        bump_model_version(model)
+
+
+def schedule_derivatives(name, model=None):
+    """Generate derivatives for ``name`` in the background once the current transaction commits."""
+    if name:
+        transaction.on_commit(lambda: _executor.submit(_generate_and_refresh, name, model))
+
+
+def available_widths(name):
+    """Return the derivative widths already on disk for ``name`` without generating anything."""
+    key = _widths_cache_key(name)
+    widths = cache.get(key)
+    if widths is None:
+        widths = tuple(
+            width for width in DERIVATIVE_WIDTHS
+            if derivative_storage.exists(derivative_name(name, width, 'webp'))
+        )
+        # Recheck soon when nothing is there yet: another process may be generating them.
+        cache.set(key, widths, None if widths else 300)
+    return widths
+
+
+def srcset(name, extension):
+    return ', '.join(
+        f'{derivative_storage.url(derivative_name(name, width, extension))} {width}w'
+        for width in available_widths(name)
+    )
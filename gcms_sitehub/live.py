@@ -0,0 +1,135 @@
+import asyncio
+import json
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+from .caching import get_model_versions
+from .models import ExamResult
+
+# Seconds between checks of the ExamResult version counter (a single cache read).
+RESULT_STREAM_POLL_INTERVAL = 2
+
+# Seconds of silence after which a comment line keeps proxies from closing the stream.
+RESULT_STREAM_HEARTBEAT = 15
+
+# Seconds a WSGI-served client waits before reconnecting for a fresh snapshot.
+RESULT_STREAM_RETRY = 10
+
+# Updates buffered per client; a client that falls this far behind only misses stale ones.
+RESULT_STREAM_QUEUE_SIZE = 100
+
+
+# ============================ Snapshots ============================
+
+async def _load_snapshot():
+    rows = ExamResult.objects.recent().values('id', 'status', 'progress')
+    return {row['id']: row async for row in rows}
+
+
+def _event(row):
+    return f'id: {row["id"]}\nevent: progress\ndata: {json.dumps(row)}\n\n'
+
+
+def _offer(queue, row):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(row)
+
+
+# ============================ Shared Watcher ============================
+
+class ResultProgressWatcher:
+    """
+    Polls the ExamResult version counter on behalf of every connected client.
+
+    Only when the counter moves is the (status, progress) of each result
+    reloaded, and only rows that differ from the last snapshot are fanned out
+    to the subscribers' queues, so a thousand open streams cost one cache read
+    per interval. The polling task runs while anyone is subscribed.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.snapshot = None
+        self.task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=RESULT_STREAM_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def current(self):
+        if self.snapshot is None:
+            self.snapshot = await _load_snapshot()
+        return self.snapshot
+
+    async def _run(self):
+        version = None
+        while self.subscribers:
+            latest = await sync_to_async(get_model_versions)([ExamResult])
+            if latest != version:
+                version = latest
+                previous, self.snapshot = self.snapshot, await _load_snapshot()
+                if previous is not None:
+                    changed = [row for pk, row in self.snapshot.items() if previous.get(pk) != row]
+                    for queue in list(self.subscribers):
+                        for row in changed:
+                            _offer(queue, row)
+            await asyncio.sleep(RESULT_STREAM_POLL_INTERVAL)
+
+
+# Event loops own their tasks and queues, so each loop gets its own watcher.
+_watchers = weakref.WeakKeyDictionary()
+
+
+def get_watcher():
+    loop = asyncio.get_running_loop()
+    if loop not in _watchers:
+        _watchers[loop] = ResultProgressWatcher()
+    return _watchers[loop]
+
+
+# ============================ Streams ============================
+
+async def _stream(watcher):
+    queue = watcher.subscribe()
+    try:
+        for row in (await watcher.current()).values():
+            yield _event(row)
+        while True:
+            try:
+                row = await asyncio.wait_for(queue.get(), RESULT_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+            else:
+                yield _event(row)
+    finally:
+        watcher.unsubscribe(queue)
+
+
+async def result_progress_response(request):
+    """
+    A ``text/event-stream`` of ``progress`` events: every recent result on
+    connect, then each one whose status or progress changes.
+
+    Under WSGI a worker cannot be parked on an open stream, so the current
+    snapshot is sent once with a ``retry`` hint and EventSource reconnects.
+    """
+    if isinstance(request, ASGIRequest):
+        content = _stream(get_watcher())
+    else:
+        snapshot = await _load_snapshot()
+        content = [f'retry: {RESULT_STREAM_RETRY * 1000}\n\n'] + [_event(row) for row in snapshot.values()]
+    response = StreamingHttpResponse(content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # nginx would otherwise buffer the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
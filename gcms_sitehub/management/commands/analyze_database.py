@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the planner statistics of every database with ANALYZE. The admin's "
+        "row counts for large tables are read from them; run after bulk imports and daily."
+    )
+
+    def handle(self, *args, **options):
+        for connection in connections.all():
+            if connection.vendor not in ('sqlite', 'postgresql'):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            self.stdout.write(f'{connection.alias}: analyzed.')
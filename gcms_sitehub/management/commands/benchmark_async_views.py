@@ -0,0 +1,68 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+
+DEFAULT_PATHS = ['/', '/about/']
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare p50/p99 latency of pages served through Django's WSGI handler and its "
+        "ASGI handler, in-process and with the page cache off."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+        parser.add_argument('--requests', type=int, default=200, help='Requests per path and handler.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once.')
+
+    @override_settings(PAGE_CACHE_ENABLED=False, ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        for path in options['paths']:
+            wsgi = self._wsgi(path, options['requests'], options['concurrency'])
+            asgi = asyncio.run(self._asgi(path, options['requests'], options['concurrency']))
+            for label, (latencies, elapsed) in (('WSGI', wsgi), ('ASGI', asgi)):
+                self.stdout.write(
+                    f'{path:<16} {label}: p50 {statistics.median(latencies) * 1000:7.2f} ms, '
+                    f'p99 {_percentile(latencies, 0.99) * 1000:7.2f} ms, '
+                    f'{len(latencies) / elapsed:7.1f} req/s'
+                )
+
+    def _wsgi(self, path, total, concurrency):
+        def fetch(_):
+            client = Client()
+            started = time.perf_counter()
+            response = client.get(path)
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - started
+
+        fetch(None)  # warm up templates and connections
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(fetch, range(total)))
+        return latencies, time.perf_counter() - started
+
+    async def _asgi(self, path, total, concurrency):
+        client = AsyncClient()
+        slots = asyncio.Semaphore(concurrency)
+
+        async def fetch():
+            async with slots:
+                started = time.perf_counter()
+                response = await client.get(path)
+                assert response.status_code == 200, response.status_code
+                return time.perf_counter() - started
+
+        await fetch()
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(fetch() for _ in range(total)))
+        return latencies, time.perf_counter() - started
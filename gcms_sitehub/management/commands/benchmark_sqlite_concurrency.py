@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections, router
+
+from gcms_sitehub.models import OnlineApplication
+
+APPLICATION_TABLE = OnlineApplication._meta.db_table
+
+READ_QUERY = f'SELECT * FROM {APPLICATION_TABLE} ORDER BY created_at DESC, id DESC LIMIT 20'
+INSERT_QUERY = (
+    f'INSERT INTO {APPLICATION_TABLE} '
+    '(full_name, email, phone, address, program, previous_institute, year_completed, intake, created_at) '
+    "VALUES (?, ?, '03000000000', 'Swat', 'ICS', 'Government School Swat', 2024, 'benchmark', datetime('now'))"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure page-read throughput on a scratch copy of the database while bursts of "
+        "OnlineApplication inserts run, with SQLite defaults and with the tuned OPTIONS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run.')
+        parser.add_argument('--readers', type=int, default=4, help='Concurrent reader threads.')
+        parser.add_argument('--writers', type=int, default=2, help='Concurrent writer threads.')
+        parser.add_argument('--burst', type=int, default=200, help='Rows inserted per write transaction.')
+
+    def handle(self, *args, **options):
+        alias = router.db_for_write(OnlineApplication)
+        if connections[alias].vendor != 'sqlite':
+            self.stderr.write('This benchmark only applies to SQLite.')
+            return
+
+        tuned = settings.DATABASES[alias].get('OPTIONS', {})
+        profiles = {
+            'defaults': {'init_command': 'PRAGMA journal_mode=DELETE;', 'begin': 'BEGIN', 'timeout': 5},
+            'tuned': {
+                'init_command': tuned.get('init_command', ''),
+                'begin': f"BEGIN {tuned.get('transaction_mode', 'DEFERRED')}",
+                'timeout': tuned.get('timeout', 5),
+            },
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            for label, profile in profiles.items():
+                path = os.path.join(directory, f'{label}.sqlite3')
+                # Online backup, so the live database stays usable while it is copied.
+                with sqlite3.connect(settings.DATABASES[alias]['NAME']) as source, \
+                        sqlite3.connect(path) as target:
+                    source.backup(target)
+                result = self._run(path, profile, options)
+                self.stdout.write(
+                    f"{label:>8}: {result['reads'] / options['seconds']:8.0f} reads/s, "
+                    f"p95 read {result['p95'] * 1000:6.1f} ms, "
+                    f"{result['rows']} rows written, {result['locked']} 'database is locked' error(s)"
+                )
+
+    def _connect(self, path, profile):
+        db = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None, check_same_thread=False)
+        db.executescript(profile['init_command'])
+        return db
+
+    def _run(self, path, profile, options):
+        stop = threading.Event()
+        lock = threading.Lock()
+        result = {'reads': 0, 'latencies': [], 'rows': 0, 'locked': 0}
+
+        def reader():
+            db = self._connect(path, profile)
+            reads, latencies = 0, []
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    db.execute(READ_QUERY).fetchall()
+                except sqlite3.OperationalError:
+                    with lock:
+                        result['locked'] += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                reads += 1
+            db.close()
+            with lock:
+                result['reads'] += reads
+                result['latencies'].extend(latencies)
+
+        def writer(number):
+            db = self._connect(path, profile)
+            batch = 0
+            while not stop.is_set():
+                # Emails are unique per row: (email, program, intake) is a unique constraint.
+                rows = [
+                    (f'Benchmark {number}-{batch}-{i}', f'bench{number}-{batch}-{i}@example.com')
+                    for i in range(options['burst'])
+                ]
+                try:
+                    db.execute(profile['begin'])
+                    db.executemany(INSERT_QUERY, rows)
+                    db.execute('COMMIT')
+                except sqlite3.OperationalError:
+                    if db.in_transaction:
+                        db.execute('ROLLBACK')
+                    with lock:
+                        result['locked'] += 1
+                    continue
+                with lock:
+                    result['rows'] += len(rows)
+                batch += 1
+                time.sleep(0.01)
+            db.close()
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=writer, args=(number,)) for number in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        latencies = sorted(result['latencies']) or [0.0]
+        result['p95'] = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+        return result
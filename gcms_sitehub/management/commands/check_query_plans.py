@@ -0,0 +1,124 @@
+import datetime
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.utils import timezone
+
+from gcms_sitehub.models import (
+    ContactMessage, Event, Exam, ExamResult, LibraryBook, News, OnlineApplication, Rule,
+    StudentResult,
+)
+from gcms_sitehub.pagination import CursorPaginator, estimated_row_count
+from gcms_sitehub.views import _local_day_bounds
+
+# A bare "SCAN <table>" reads every row; "SCAN <table> USING INDEX" walks an index in order.
+FULL_SCAN = re.compile(r'\bSCAN (\w+)\b(?! USING)')
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+def _after(queryset, ordering, values):
+    """The query a CursorPaginator runs for the page after the row with ``values``."""
+    paginator = CursorPaginator(queryset, ordering, 10)
+    return queryset.filter(paginator._seek(values, backwards=False)).order_by(*ordering)[:11]
+
+
+def hot_queries():
+    """
+    The list, filter and ordering queries issued by views.py and admin.py
+    changelists. gcms_sitehub.tests checks the views' own queries; keep these in
+    step with them.
+    """
+    now = timezone.now()
+    today = timezone.localdate()
+    start, end = _local_day_bounds()
+    return {
+        'event_list': Event.objects.order_by('-date', 'id')[:11],
+        'event_list ?category=upcoming': Event.objects.filter(date__gte=end).order_by('-date', 'id')[:11],
+        'event_list ?category=happening': (
+            Event.objects.filter(date__gte=start, date__lt=end).order_by('-date', 'id')[:11]
+        ),
+        'event_list ?cursor=': _after(Event.objects.all(), ('-date', 'id'), [now, 1]),
+        'news_list': News.objects.order_by('-date', 'id')[:10],
+        'news_list ?cursor=': _after(News.objects.all(), ('-date', 'id'), [now, 1]),
+        'library_home': LibraryBook.objects.order_by('title', 'id')[:10],
+        'library_home ?cursor=': _after(LibraryBook.objects.all(), ('title', 'id'), ['M', 1]),
+        'library_home ?category=': LibraryBook.objects.filter(category='cs').order_by('title', 'id')[:10],
+        'library_home ?category=&cursor=': _after(
+            LibraryBook.objects.filter(category='cs'), ('title', 'id'), ['M', 1],
+        ),
+        'library_facets': LibraryBook.objects.order_by().values('category').annotate(count=Count('id')),
+        'examination_info rules': Rule.objects.filter(visible=True),
+        'examination_info results': (
+            ExamResult.objects.recent().select_related('exam__department').order_by('-release_date', '-id')
+        ),
+        'examination_info departments': Exam.objects.current().filter(department_id=1).values('pk')[:1],
+        'examination_archive': Exam.objects.past().order_by('-start_date', '-id')[:11],
+        'examination_archive ?cursor=': _after(Exam.objects.past(), ('-start_date', '-id'), [today, 1]),
+        'result_lookup': StudentResult.objects.filter(
+            result_id=1, result__status='Released', roll_number='1001',
+        ).values('roll_number', 'student_name', 'marks')[:1],
+        'admin onlineapplication': OnlineApplication.objects.order_by('-created_at', '-pk')[:100],
+        'admin onlineapplication ?program=': (
+            OnlineApplication.objects.filter(program='ICS').order_by('-created_at', '-pk')[:100]
+        ),
+        'admin onlineapplication intake filter': (
+            OnlineApplication.objects.order_by('intake').values('intake').distinct()
+        ),
+        'admin onlineapplication year_completed filter': (
+            OnlineApplication.objects.order_by('year_completed').values('year_completed').distinct()
+        ),
+        'admin contactmessage': ContactMessage.objects.order_by('-date_sent', '-pk')[:100],
+        'admin exam': Exam.objects.order_by('-start_date', '-pk')[:100],
+        'admin exam status filter': Exam.objects.order_by('status').values('status').distinct(),
+        'admin examresult': ExamResult.objects.order_by('-release_date', '-pk')[:100],
+        'admin examresult status filter': ExamResult.objects.order_by('status').values('status').distinct(),
+        'admin examresult date_hierarchy': (
+            ExamResult.objects.filter(release_date__year=today.year)
+            .order_by('-release_date', '-pk')[:100]
+        ),
+        'admin exam date_hierarchy': Exam.objects.filter(
+            start_date__gte=datetime.date(today.year, 1, 1),
+            start_date__lt=datetime.date(today.year + 1, 1, 1),
+        ).order_by('-start_date', '-pk')[:100],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN QUERY PLAN for the site's hot list/filter queries and fail if any "
+        "of them reads a whole table or sorts in a temporary b-tree."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rows', type=int, default=1000,
+            help="Ignore tables that ANALYZE found smaller than this; SQLite rightly scans tiny tables.",
+        )
+
+    def handle(self, *args, **options):
+        if any(connection.vendor != 'sqlite' for connection in connections.all()):
+            raise CommandError('Query plans are only checked on SQLite.')
+
+        failures = []
+        for label, queryset in hot_queries().items():
+            plan = queryset.explain()
+            problems = [f'full scan of {table}' for table in FULL_SCAN.findall(plan)]
+            if TEMP_SORT in plan:
+                problems.append('sort without an index')
+            estimate = estimated_row_count(queryset.model, using=queryset.db)
+            if problems and estimate is not None and estimate < options['min_rows']:
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{label}: skipped, {estimate} row(s)')
+                continue
+            if problems:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'{label}: {", ".join(problems)}'))
+                self.stdout.write(plan)
+            elif options['verbosity'] > 1:
+                self.stdout.write(f'{label}: ok\n{plan}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} query plan(s) regressed to a table scan.')
+        self.stdout.write(self.style.SUCCESS('Every hot query uses an index.'))
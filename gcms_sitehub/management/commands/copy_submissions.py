@@ -0,0 +1,262 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Cast, ExtractYear, Lower
+from django.utils import timezone
+
+from gcms_sitehub.routers import SUBMISSION_MODELS, SUBMISSIONS_DB, submissions_enabled
+
+COPY_CHUNK_SIZE = 1000
+
+
+def _chunks(rows, size=COPY_CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy contact messages, online applications and visit requests written to the "
+        "default database before the submissions database existed. Safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete', action='store_true',
+            help='Empty the old tables in the default database once every row is verified in the new one.',
+        )
+
+    def handle(self, *args, **options):
+        if not submissions_enabled():
+            raise CommandError(f'DATABASES has no {SUBMISSIONS_DB!r} alias.')
+
+        source_tables = connections[DEFAULT_DB_ALIAS].introspection.table_names()
+        kept = []
+        for model_name in sorted(SUBMISSION_MODELS):
+            model = apps.get_model('gcms_sitehub', model_name)
+            if model._meta.db_table not in source_tables:
+                continue
+            target = router.db_for_write(model)
+            copied = COPIERS.get(model_name, _ModelCopy)(model, target)
+            copied.run()
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {copied.describe()}')
+
+            if options['delete']:
+                missing = copied.unverified()
+                if missing:
+                    kept.append(model._meta.verbose_name_plural)
+                    self.stderr.write(
+                        f'{model._meta.verbose_name_plural}: {len(missing)} row(s) not found in {target!r} '
+                        f'(ids {", ".join(map(str, missing[:20]))}{", ..." if len(missing) > 20 else ""}); '
+                        'nothing deleted.'
+                    )
+                else:
+                    deleted = copied.delete_source()
+                    self.stdout.write(f'{model._meta.verbose_name_plural}: {deleted} row(s) deleted from the default database.')
+        if kept:
+            raise CommandError(f'Kept the old rows of {", ".join(kept)}; re-run once they are copied.')
+
+
+class _ModelCopy:
+    """
+    Copy one model's rows from the default database into ``target``.
+
+    Rows are inserted with plain SQL so ``auto_now_add`` timestamps keep their
+    original values. A row is already present when the target holds the same
+    values under the same id, or under another id if a new submission took
+    its id before it was copied; otherwise a row whose id is taken is inserted
+    under a new one. ``mapping`` records the target id of every copied row.
+
+    Subclasses adjust single rows in ``prepare`` and each chunk of rows, once
+    the target can be consulted, in ``prepare_chunk``.
+    """
+
+    def __init__(self, model, target):
+        self.model = model
+        self.target = target
+        self.connection = connections[target]
+        self.source = model._base_manager.using(DEFAULT_DB_ALIAS).order_by('pk')
+        self.targets = model._base_manager.using(target)
+        self.pk = model._meta.pk.attname
+        source = connections[DEFAULT_DB_ALIAS]
+        with source.cursor() as cursor:
+            columns = {
+                column.name for column in
+                source.introspection.get_table_description(cursor, model._meta.db_table)
+            }
+        self.fields = model._meta.concrete_fields
+        # The old table stopped being migrated, so it may lack newer columns;
+        # those take their defaults and are left out of comparisons.
+        self.copied = [field.attname for field in self.fields if field.column in columns]
+        self.defaults = [field for field in self.fields if field.column not in columns]
+        self.content = [name for name in self.copied if name != self.pk]
+        self.mapping = {}
+        self.inserted = self.present = self.remapped = 0
+
+    def describe(self):
+        return (
+            f'{self.inserted} copied, {self.present} already present, '
+            f'{self.remapped} given new ids in {self.target!r}.'
+        )
+
+    def prepare(self, row):
+        """Bring a source row in line with what the target's migrations did to its own rows."""
+
+    def prepare_chunk(self, rows):
+        """Adjust a chunk of prepared rows against what the target already holds."""
+
+    def _rows(self, fields):
+        for row in self.source.values(*fields).iterator(chunk_size=COPY_CHUNK_SIZE):
+            row.update((field.attname, field.get_default()) for field in self.defaults)
+            self.prepare(row)
+            yield row
+
+    def run(self):
+        for chunk in _chunks(self._rows(self.copied)):
+            self.prepare_chunk(chunk)
+            taken = {
+                row[self.pk]: row
+                for row in self.targets.filter(pk__in=[row[self.pk] for row in chunk]).values(self.pk, *self.content)
+            }
+            new, moved = [], []
+            for row in chunk:
+                existing = taken.get(row[self.pk])
+                if existing is None:
+                    new.append(row)
+                elif self._same(existing, row):
+                    self.mapping[row[self.pk]] = row[self.pk]
+                    self.present += 1
+                else:
+                    match = self.targets.filter(**self._values(row)).values_list('pk', flat=True).first()
+                    if match is not None:
+                        self.mapping[row[self.pk]] = match
+                        self.present += 1
+                    else:
+                        moved.append(row)
+
+            # A submission taking one of these ids meanwhile fails the chunk; re-run.
+            with transaction.atomic(using=self.target), self.connection.cursor() as cursor:
+                if new:
+                    cursor.executemany(*self._insert(new, self.fields))
+                    self.mapping.update((row[self.pk], row[self.pk]) for row in new)
+                    self.inserted += len(new)
+                fields = [field for field in self.fields if not field.primary_key]
+                for row in moved:
+                    cursor.execute(*self._insert([row], fields, many=False))
+                    self.mapping[row[self.pk]] = self.connection.ops.last_insert_id(
+                        cursor, self.model._meta.db_table, self.model._meta.pk.column,
+                    )
+                    self.remapped += 1
+
+    def unverified(self):
+        """Ids of source rows whose values are not in the target under their mapped id."""
+        missing = []
+        for chunk in _chunks(self._rows([self.pk, *self.content])):
+            ids = [self.mapping[row[self.pk]] for row in chunk if row[self.pk] in self.mapping]
+            copies = {copy[self.pk]: copy for copy in self.targets.filter(pk__in=ids).values(self.pk, *self.content)}
+            for row in chunk:
+                copy = copies.get(self.mapping.get(row[self.pk]))
+                if copy is None or not self._same(copy, row):
+                    missing.append(row[self.pk])
+        return missing
+
+    def delete_source(self):
+        """Delete the copied rows from the default database; returns how many went."""
+        # Plain SQL: the ORM would select columns the old table may not have.
+        connection = connections[DEFAULT_DB_ALIAS]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        column = connection.ops.quote_name(self.model._meta.pk.column)
+        ids = list(self.mapping)
+        deleted = 0
+        with transaction.atomic(using=DEFAULT_DB_ALIAS), connection.cursor() as cursor:
+            for start in range(0, len(ids), COPY_CHUNK_SIZE):
+                chunk = ids[start:start + COPY_CHUNK_SIZE]
+                cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({", ".join(["%s"] * len(chunk))})', chunk)
+                deleted += cursor.rowcount
+        return deleted
+
+    def _values(self, row):
+        return {name: row[name] for name in self.content}
+
+    def _same(self, existing, row):
+        return all(existing[name] == row[name] for name in self.content)
+
+    def _insert(self, rows, fields, many=True):
+        quote = self.connection.ops.quote_name
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(self.model._meta.db_table),
+            ', '.join(quote(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        params = [[field.get_db_prep_save(row[field.attname], self.connection) for field in fields] for row in rows]
+        return sql, params if many else params[0]
+
+
+class _ApplicationCopy(_ModelCopy):
+    """
+    Online applications get what migration 0057 gave the rows already in the
+    target: lowercase emails and the intake of the year they were sent. Of
+    the applications sharing an (email, program, intake) only one is current;
+    the others are copied too, marked superseded. A row is superseded when a
+    later old row repeats its key, or when the target already holds another
+    current application under it, which was sent after the split.
+    """
+
+    key = ('email', 'program', 'intake')
+
+    def __init__(self, model, target):
+        super().__init__(model, target)
+        self.superseded = 0
+        self.older = set()
+
+    def describe(self):
+        return f'{super().describe()} {self.superseded} superseded by a later application.'
+
+    def run(self):
+        self.older = self._older_duplicates()
+        super().run()
+
+    def _older_duplicates(self):
+        """Source ids of rows whose key a later source row repeats."""
+        if 'intake' in self.copied:
+            intake = F('intake')
+        else:
+            # ExtractYear works in the current time zone, like localtime() in prepare().
+            intake = Cast(ExtractYear('created_at'), self.model._meta.get_field('intake'))
+        source = self.source.order_by().annotate(key_email=Lower('email'), key_intake=intake)
+        names = ['key_email', 'program', 'key_intake']
+        # Only the groups that repeat a key leave the database.
+        groups = source.values(*names).annotate(rows=Count('pk')).filter(rows__gt=1).values(*names)
+        older = set()
+        for group in groups.iterator():
+            ids = list(source.filter(**group).order_by('created_at', 'pk').values_list('pk', flat=True))
+            older.update(ids[:-1])
+        return older
+
+    def prepare(self, row):
+        row['email'] = row['email'].lower()
+        if 'intake' not in self.copied:
+            row['intake'] = str(timezone.localtime(row['created_at']).year)
+
+    def prepare_chunk(self, rows):
+        lookups = {f'{name}__in': {row[name] for row in rows} for name in self.key}
+        current = {
+            tuple(other[name] for name in self.key): other
+            for other in self.targets.filter(superseded=False, **lookups).values(*self.key, *self.content)
+        }
+        for row in rows:
+            other = current.get(tuple(row[name] for name in self.key))
+            # The target's current application may be this very row, copied by an earlier run.
+            if row[self.pk] in self.older or (other is not None and not self._same(other, row)):
+                row['superseded'] = True
+            self.superseded += row['superseded']
+
+
+COPIERS = {'onlineapplication': _ApplicationCopy}
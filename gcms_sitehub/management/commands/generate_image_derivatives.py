@@ -0,0 +1,30 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from gcms_sitehub.caching import bump_model_version
+from gcms_sitehub.images import RESPONSIVE_IMAGE_FIELDS, generate_derivatives
+
+
+class Command(BaseCommand):
+    help = "Generate the resized WebP/JPEG variants used by {% responsive_image %} for existing uploads."
+
+    def handle(self, *args, **options):
+        total = 0
+        for label, field_name in RESPONSIVE_IMAGE_FIELDS:
+            model = apps.get_model(label)
+            names = (
+                model.objects.exclude(**{field_name: ''})
+                .values_list(field_name, flat=True)
+                .distinct()
+                .iterator()
+            )
+            model_total = 0
+            for name in names:
+                written = generate_derivatives(name)
+                model_total += written
+                if written and options['verbosity'] > 1:
+                    self.stdout.write(f'{name}: {written} file(s)')
+            if model_total:
+                bump_model_version(model)
+            total += model_total
+        self.stdout.write(self.style.SUCCESS(f'Wrote {total} derivative file(s).'))
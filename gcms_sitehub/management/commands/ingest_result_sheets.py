@@ -0,0 +1,33 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from gcms_sitehub.models import ExamResult
+from gcms_sitehub.results import ingest_result_sheet
+
+
+class Command(BaseCommand):
+    help = "Load the per-student rows of ExamResult result sheets (.csv/.xlsx) into StudentResult."
+
+    def add_arguments(self, parser):
+        parser.add_argument('result_ids', nargs='*', type=int, help='ExamResult ids; every result with a sheet if omitted.')
+
+    def handle(self, *args, **options):
+        results = ExamResult.objects.exclude(result_file='').exclude(result_file=None).select_related('exam__department')
+        if options['result_ids']:
+            results = results.filter(pk__in=options['result_ids'])
+
+        failures = 0
+        for result in results:
+            try:
+                created, skipped = ingest_result_sheet(result)
+            except ValidationError as error:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'{result}: {" ".join(error.messages)}'))
+                continue
+            self.stdout.write(f'{result}: {created} student result(s), {len(skipped)} row(s) skipped')
+            if options['verbosity'] > 1:
+                for problem in skipped:
+                    self.stdout.write(f'  {problem}')
+
+        if failures:
+            raise CommandError(f'{failures} result sheet(s) could not be loaded.')
@@ -0,0 +1,89 @@
+import os
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+
+from gcms_sitehub.caching import bump_model_version
+from gcms_sitehub.storage import CONTENT_ADDRESSED_PREFIX, ContentAddressedStorage
+
+# Top-level media directories that are not uploads.
+SKIPPED_DIRECTORIES = {CONTENT_ADDRESSED_PREFIX, 'derivatives'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Move existing uploads into content-addressed storage, one file at a time, "
+        "and point every FileField/ImageField that referenced them at the new name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing.')
+        parser.add_argument(
+            '--delete-originals', action='store_true',
+            help='Remove each migrated original unless it is still a field default.',
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError('STORAGES["default"] must be gcms_sitehub.storage.ContentAddressedStorage.')
+
+        file_fields = [
+            (model, field.name)
+            for model in apps.get_models()
+            for field in model._meta.get_fields()
+            if isinstance(field, models.FileField)
+        ]
+        defaults = {
+            model._meta.get_field(name).default
+            for model, name in file_fields
+            if isinstance(model._meta.get_field(name).default, str)
+        }
+
+        touched = set()
+        migrated = rows = 0
+        for name in self._walk(default_storage.location):
+            if options['dry_run']:
+                references = sum(
+                    model._default_manager.filter(**{field_name: name}).count()
+                    for model, field_name in file_fields
+                )
+                self.stdout.write(f'{name}: {references} reference(s)')
+                continue
+
+            with default_storage.open(name) as original:
+                new_name = default_storage.save(name, File(original, name=name))
+            with transaction.atomic():
+                for model, field_name in file_fields:
+                    updated = model._default_manager.filter(**{field_name: name}).update(**{field_name: new_name})
+                    if updated:
+                        touched.add(model)
+                        rows += updated
+            if options['delete_originals'] and name not in defaults:
+                os.remove(default_storage.path(name))
+            migrated += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{name} -> {new_name}')
+
+        if options['dry_run']:
+            return
+        # QuerySet.update() sends no signals, so retire cached pages by hand.
+        for model in touched:
+            bump_model_version(model)
+        if touched:
+            call_command('generate_image_derivatives', verbosity=options['verbosity'])
+        self.stdout.write(self.style.SUCCESS(f'Migrated {migrated} file(s), updated {rows} reference(s).'))
+
+    def _walk(self, root):
+        """Yield the storage name of every upload under ``root``, lazily."""
+        for directory, subdirectories, filenames in os.walk(root):
+            relative = os.path.relpath(directory, root)
+            if relative == '.':
+                relative = ''
+                subdirectories[:] = [name for name in subdirectories if name not in SKIPPED_DIRECTORIES]
+            subdirectories.sort()
+            for filename in sorted(filenames):
+                yield os.path.join(relative, filename).replace(os.sep, '/')
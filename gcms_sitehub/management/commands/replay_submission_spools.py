@@ -0,0 +1,24 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from gcms_sitehub.routers import SUBMISSION_MODELS
+from gcms_sitehub.writers import fcntl, get_writer
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the submissions left in spool files by crashed or killed workers. "
+        "Safe to run while the site is up; live spools are skipped."
+    )
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'SUBMISSION_SPOOL_DIR', None):
+            raise CommandError('SUBMISSION_SPOOL_DIR is not set.')
+        if fcntl is None:
+            raise CommandError('Spool files need fcntl.flock(), which this platform lacks.')
+
+        for model_name in sorted(SUBMISSION_MODELS):
+            model = apps.get_model('gcms_sitehub', model_name)
+            replayed = get_writer(model).replay_stale_spools()
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {replayed} spooled row(s) replayed.')
@@ -0,0 +1,129 @@
+# Generated by Django 5.2 on 2026-10-18 10:47
+#
+# Stands in for 0042-0049, which were applied to db.sqlite3 (recorded up to this
+# name on 2025-06-30) but never committed. It takes the recorded name so existing
+# databases treat it as applied, and builds the same tables on a fresh database:
+# the 0049 schema it produces matches db.sqlite3 column for column. Never edit
+# it: databases that already recorded 0049 will not run it again.
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gcms_sitehub', '0041_remove_event_video_url'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Course',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(default='Untitled Course', max_length=100)),
+                ('slug', models.SlugField(blank=True, unique=True)),
+                ('description', models.TextField(default='No description available at the moment.')),
+                ('duration', models.CharField(default='Duration not specified', max_length=50)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='course_images/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OnlineApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_name', models.CharField(max_length=100, verbose_name='Full Name')),
+                ('email', models.EmailField(max_length=254, verbose_name='Email')),
+                ('phone', models.CharField(max_length=20, verbose_name='Phone Number')),
+                ('address', models.TextField(default='Swat, Khyber Pakhtunkhwa', verbose_name='Address')),
+                ('program', models.CharField(choices=[('ICS', 'ICS (Computer Science)'), ('Computer Science', 'Computer Science'), ('I.Com', 'I.Com (Commerce)'), ('D.Com', 'D.Com (Diploma in Commerce)'), ('DIT', 'DIT (Diploma in IT)'), ('Business Admin', 'Business Administration'), ('FSc Pre-Engineering', 'FSc Pre-Engineering'), ('Commerce', 'Commerce'), ('Other', 'Other')], default='ICS', max_length=50, verbose_name='Program Applying For')),
+                ('previous_institute', models.CharField(default='Government School Swat', max_length=150, verbose_name='Previous School/College')),
+                ('year_completed', models.PositiveIntegerField(default=2024, verbose_name='Year Completed')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Online Application',
+                'verbose_name_plural': 'Online Applications',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.RemoveField(
+            model_name='examschedule',
+            name='exam',
+        ),
+        migrations.DeleteModel(
+            name='FacilitySlider',
+        ),
+        migrations.AlterModelOptions(
+            name='rule',
+            options={'ordering': ['order', 'created_at']},
+        ),
+        migrations.RemoveField(
+            model_name='exam',
+            name='exam_type',
+        ),
+        migrations.RemoveField(
+            model_name='exam',
+            name='subjects',
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='department',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='exams', to='gcms_sitehub.department'),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='schedule_file',
+            field=models.FileField(blank=True, null=True, upload_to='exam_schedules/'),
+        ),
+        migrations.AddField(
+            model_name='examresult',
+            name='result_file',
+            field=models.FileField(blank=True, null=True, upload_to='results/'),
+        ),
+        migrations.AddField(
+            model_name='rule',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='rule',
+            name='order',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rule',
+            name='visible',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='exam',
+            name='status',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='exam',
+            name='time',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='exam',
+            name='title',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='exam',
+            name='venue',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.DeleteModel(
+            name='ExamSchedule',
+        ),
+    ]
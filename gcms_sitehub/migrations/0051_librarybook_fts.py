@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def install_library_index(apps, schema_editor):
+    from gcms_sitehub.search import install_library_index
+    install_library_index(schema_editor.connection)
+
+
+def uninstall_library_index(apps, schema_editor):
+    from gcms_sitehub.search import uninstall_library_index
+    uninstall_library_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gcms_sitehub', '0050_content_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            install_library_index,
+            uninstall_library_index,
+            hints={'model_name': 'librarybook'},
+        ),
+    ]
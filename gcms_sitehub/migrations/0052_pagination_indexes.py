@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gcms_sitehub', '0051_librarybook_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['-date', 'id'], name='event_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='librarybook',
+            index=models.Index(fields=['title', 'id'], name='librarybook_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['-date', 'id'], name='news_date_id_idx'),
+        ),
+    ]
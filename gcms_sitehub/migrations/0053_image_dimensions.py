@@ -0,0 +1,147 @@
+# Generated by Django 5.2 on 2026-10-18 10:53
+
+import gcms_sitehub.models
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+from PIL import Image
+
+
+MEASURED_IMAGE_FIELDS = [
+    ('department', 'image'),
+    ('event', 'event_image'),
+    ('facultymember', 'image'),
+    ('galleryimage', 'image'),
+    ('librarybook', 'image'),
+    ('news', 'image'),
+    ('testimonial', 'image'),
+]
+
+
+def record_image_dimensions(apps, schema_editor):
+    """Measure the images already uploaded; missing files keep unknown dimensions."""
+    for model_name, field_name in MEASURED_IMAGE_FIELDS:
+        model = apps.get_model('gcms_sitehub', model_name)
+        rows = model.objects.exclude(**{field_name: ''}).values_list('pk', field_name)
+        for pk, name in rows.iterator():
+            try:
+                with default_storage.open(name) as image_file:
+                    width, height = Image.open(image_file).size
+            except (OSError, ValueError):
+                continue
+            model.objects.filter(pk=pk).update(image_width=width, image_height=height)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gcms_sitehub', '0052_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='facultymember',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='facultymember',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='galleryimage',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='librarybook',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='librarybook',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='testimonial',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='testimonial',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='department',
+            name='image',
+            field=gcms_sitehub.models.MeasuredImageField(default='departments/default.png', height_field='image_height', upload_to='departments/', width_field='image_width'),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='event_image',
+            field=gcms_sitehub.models.MeasuredImageField(default='event/default.png', height_field='image_height', upload_to='event/', width_field='image_width'),
+        ),
+        migrations.AlterField(
+            model_name='facultymember',
+            name='image',
+            field=gcms_sitehub.models.MeasuredImageField(default='faculty/default.jpg', height_field='image_height', upload_to='faculty/', width_field='image_width'),
+        ),
+        migrations.AlterField(
+            model_name='galleryimage',
+            name='image',
+            field=gcms_sitehub.models.MeasuredImageField(height_field='image_height', upload_to='gallery/', width_field='image_width'),
+        ),
+        migrations.AlterField(
+            model_name='librarybook',
+            name='image',
+            field=gcms_sitehub.models.MeasuredImageField(default='library_books/default.jpg', height_field='image_height', upload_to='library_books/', width_field='image_width'),
+        ),
+        migrations.AlterField(
+            model_name='news',
+            name='image',
+            field=gcms_sitehub.models.MeasuredImageField(default='news/default.jpg', height_field='image_height', upload_to='news/', width_field='image_width'),
+        ),
+        migrations.AlterField(
+            model_name='testimonial',
+            name='image',
+            field=gcms_sitehub.models.MeasuredImageField(default='testimonials/default.jpg', height_field='image_height', upload_to='testimonials/', width_field='image_width'),
+        ),
+        migrations.RunPython(record_image_dimensions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gcms_sitehub', '0053_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['date_sent', 'id'], name='contactmessage_sent_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['start_date', 'id'], name='exam_start_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examresult',
+            index=models.Index(fields=['release_date', 'id'], name='examresult_release_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='librarybook',
+            index=models.Index(fields=['category', 'title', 'id'], name='librarybook_cat_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onlineapplication',
+            index=models.Index(fields=['created_at', 'id'], name='onlineapp_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onlineapplication',
+            index=models.Index(fields=['program', 'created_at', 'id'], name='onlineapp_program_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rule',
+            index=models.Index(condition=models.Q(('visible', True)), fields=['order', 'created_at'], name='rule_visible_order_idx'),
+        ),
+    ]
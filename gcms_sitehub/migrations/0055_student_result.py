@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 11:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gcms_sitehub', '0054_hot_column_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('roll_number', models.CharField(max_length=50)),
+                ('student_name', models.CharField(blank=True, max_length=200)),
+                ('marks', models.JSONField(default=dict)),
+                ('result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_results', to='gcms_sitehub.examresult')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('result', 'roll_number'), name='studentresult_result_roll_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2 on 2026-10-18 11:16
+
+import gcms_sitehub.models
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def assign_intakes_and_mark_superseded(apps, schema_editor):
+    """
+    File existing applications under the year they were sent, lowercase their
+    emails and mark all but the latest of any (email, program, intake) repeats
+    as superseded. No application is deleted.
+    """
+    OnlineApplication = apps.get_model('gcms_sitehub', 'onlineapplication')
+    applications = OnlineApplication.objects.using(schema_editor.connection.alias)
+    applications.update(email=Lower('email'))
+    for year in applications.dates('created_at', 'year'):
+        applications.filter(created_at__year=year.year).update(intake=str(year.year))
+
+    repeated = (
+        applications.order_by().values('email', 'program', 'intake')
+        .annotate(rows=Count('pk')).filter(rows__gt=1).values('email', 'program', 'intake')
+    )
+    for group in repeated.iterator():
+        ids = list(applications.filter(**group).order_by('created_at', 'pk').values_list('pk', flat=True))
+        applications.filter(pk__in=ids[:-1]).update(superseded=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gcms_sitehub', '0056_exam_end_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='onlineapplication',
+            name='idempotency_key',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='onlineapplication',
+            name='intake',
+            field=models.CharField(default=gcms_sitehub.models.current_intake, max_length=20, verbose_name='Intake'),
+        ),
+        migrations.AddField(
+            model_name='onlineapplication',
+            name='superseded',
+            field=models.BooleanField(default=False, help_text='A later application with the same email, program and intake replaced this one.', verbose_name='Superseded'),
+        ),
+        migrations.RunPython(
+            assign_intakes_and_mark_superseded, migrations.RunPython.noop,
+            # Routes the data step to the database that holds online applications.
+            hints={'model_name': 'onlineapplication'},
+        ),
+        migrations.AddIndex(
+            model_name='onlineapplication',
+            index=models.Index(fields=['intake'], name='onlineapp_intake_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='onlineapplication',
+            constraint=models.UniqueConstraint(condition=models.Q(('superseded', False)), fields=('email', 'program', 'intake'), name='onlineapp_email_program_intake_uniq'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gcms_sitehub', '0058_contactmessage_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['status'], name='exam_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examresult',
+            index=models.Index(fields=['status'], name='examresult_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='onlineapplication',
+            index=models.Index(fields=['year_completed'], name='onlineapp_year_completed_idx'),
+        ),
+    ]
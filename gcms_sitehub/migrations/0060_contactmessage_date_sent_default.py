@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 11:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gcms_sitehub', '0059_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contactmessage',
+            name='date_sent',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
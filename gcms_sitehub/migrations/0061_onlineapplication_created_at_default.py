@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 11:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gcms_sitehub', '0060_contactmessage_date_sent_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='onlineapplication',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
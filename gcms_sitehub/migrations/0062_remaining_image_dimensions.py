@@ -0,0 +1,179 @@
+# Generated by Django 5.2 on 2026-10-18 11:54
+
+import gcms_sitehub.models
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+from PIL import Image
+
+
+MEASURED_IMAGE_FIELDS = [
+    ('academicexcellence', 'background_image'),
+    ('course', 'image'),
+    ('department', 'hod_image'),
+    ('facility', 'image'),
+    ('highlightsection', 'background_image'),
+    ('hostelfacility', 'image'),
+    ('hostelintro', 'image'),
+    ('philosophyblock', 'icon'),
+    ('principalmessage', 'image'),
+]
+
+
+def record_image_dimensions(apps, schema_editor):
+    """Measure the images already uploaded; missing files keep unknown dimensions."""
+    for model_name, field_name in MEASURED_IMAGE_FIELDS:
+        model = apps.get_model('gcms_sitehub', model_name)
+        rows = model.objects.exclude(**{field_name: ''}).exclude(**{field_name: None}).values_list('pk', field_name)
+        for pk, name in rows.iterator():
+            try:
+                with default_storage.open(name) as image_file:
+                    width, height = Image.open(image_file).size
+            except (OSError, ValueError):
+                continue
+            model.objects.filter(pk=pk).update(**{f'{field_name}_width': width, f'{field_name}_height': height})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gcms_sitehub', '0061_onlineapplication_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicexcellence',
+            name='background_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='academicexcellence',
+            name='background_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='hod_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='hod_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='facility',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='highlightsection',
+            name='background_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='highlightsection',
+            name='background_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='hostelfacility',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='hostelfacility',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='hostelintro',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='hostelintro',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='philosophyblock',
+            name='icon_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='philosophyblock',
+            name='icon_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='principalmessage',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='principalmessage',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='academicexcellence',
+            name='background_image',
+            field=gcms_sitehub.models.MeasuredImageField(default='backgrounds/default.jpg', height_field='background_image_height', upload_to='backgrounds/', width_field='background_image_width'),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='image',
+            field=gcms_sitehub.models.MeasuredImageField(blank=True, height_field='image_height', null=True, upload_to='course_images/', width_field='image_width'),
+        ),
+        migrations.AlterField(
+            model_name='department',
+            name='hod_image',
+            field=gcms_sitehub.models.MeasuredImageField(blank=True, height_field='hod_image_height', null=True, upload_to='hods/', width_field='hod_image_width'),
+        ),
+        migrations.AlterField(
+            model_name='facility',
+            name='image',
+            field=gcms_sitehub.models.MeasuredImageField(default='facilities/default.jpg', height_field='image_height', upload_to='facilities/', width_field='image_width'),
+        ),
+        migrations.AlterField(
+            model_name='highlightsection',
+            name='background_image',
+            field=gcms_sitehub.models.MeasuredImageField(height_field='background_image_height', upload_to='backgrounds/', width_field='background_image_width'),
+        ),
+        migrations.AlterField(
+            model_name='hostelfacility',
+            name='image',
+            field=gcms_sitehub.models.MeasuredImageField(default='hostel/default.jpg', height_field='image_height', upload_to='hostel/', width_field='image_width'),
+        ),
+        migrations.AlterField(
+            model_name='hostelintro',
+            name='image',
+            field=gcms_sitehub.models.MeasuredImageField(default='hostel/default.jpg', height_field='image_height', upload_to='hostel/', width_field='image_width'),
+        ),
+        migrations.AlterField(
+            model_name='philosophyblock',
+            name='icon',
+            field=gcms_sitehub.models.MeasuredImageField(height_field='icon_height', upload_to='icons/', width_field='icon_width'),
+        ),
+        migrations.AlterField(
+            model_name='principalmessage',
+            name='image',
+            field=gcms_sitehub.models.MeasuredImageField(default='principal_images/default.jpg', height_field='image_height', upload_to='principal_images/', width_field='image_width'),
+        ),
+        migrations.RunPython(record_image_dimensions, migrations.RunPython.noop),
+    ]
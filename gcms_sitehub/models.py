@@ -1,8 +1,35 @@
+import datetime
+
 from django.db import models
+from django.db.models.fields.files import ImageFieldFile
 from django.utils import timezone
 from django.utils.text import slugify
 
 
+# ----------------------------- Image Fields -----------------------------
+class MeasuredImageFieldFile(ImageFieldFile):
+    def _set_instance_attribute(self, name, content):
+        # Measure the stored file rather than the upload: storage may have resized it.
+        setattr(self.instance, self.field.attname, self.name)
+
+
+class MeasuredImageField(models.ImageField):
+    """
+    ImageField whose width/height columns are filled when a file is uploaded
+    or assigned, never by opening the file every time a row is loaded.
+    """
+    attr_class = MeasuredImageFieldFile
+
+    def update_dimension_fields(self, instance, force=False, *args, **kwargs):
+        if not force:
+            return
+        try:
+            super().update_dimension_fields(instance, force, *args, **kwargs)
+        except OSError:
+            # The file is missing from storage; leave the dimensions unknown.
+            pass
+
+
 # ----------------------------- Department -----------------------------
 from django.db import models
 from django.utils.text import slugify
@@ -18,16 +45,23 @@ class Department(models.Model):
         ('Other', 'Other'),
     ]
 
-    image = models.ImageField(upload_to='departments/', default='departments/default.png')
+    image = MeasuredImageField(upload_to='departments/', default='departments/default.png',
+                               width_field='image_width', height_field='image_height')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     name = models.CharField(max_length=100, default="Department Name")
     faculty = models.CharField(max_length=100, default="Faculty Member Name")
     head_of_department = models.CharField(max_length=100, default="HOD Name")  # ✅ Added this line
-    hod_image = models.ImageField(upload_to='hods/', blank=True, null=True)
+    hod_image = MeasuredImageField(upload_to='hods/', blank=True, null=True,
+                                   width_field='hod_image_width', height_field='hod_image_height')
+    hod_image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    hod_image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     description = models.TextField(default="Department description.")
     slug = models.SlugField(unique=True, blank=True)
     num_of_courses = models.IntegerField(default=0)
     num_of_students = models.IntegerField(default=0)
     degree_type = models.CharField(max_length=20, choices=DEGREE_CHOICES, default='BS')
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -63,10 +97,14 @@ class FacultyMember(models.Model):
         null=True
     )
     subject = models.CharField(max_length=100)
-    image = models.ImageField(
+    image = MeasuredImageField(
         upload_to='faculty/',
-        default='faculty/default.jpg'
+        default='faculty/default.jpg',
+        width_field='image_width',
+        height_field='image_height',
     )
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ['name']
@@ -82,7 +120,10 @@ class PrincipalMessage(models.Model):
     title = models.CharField(max_length=200, default="Message from the Principal")
     subtitle = models.CharField(max_length=200, default="Empowering parents. Nurturing futures.")
     message = models.TextField()
-    image = models.ImageField(upload_to='principal_images/', default='principal_images/default.jpg')
+    image = MeasuredImageField(upload_to='principal_images/', default='principal_images/default.jpg',
+                               width_field='image_width', height_field='image_height')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.title
@@ -90,11 +131,18 @@ class PrincipalMessage(models.Model):
 
 # ----------------------------- Event -----------------------------
 class Event(models.Model):
-    event_image = models.ImageField(upload_to='event/', default='event/default.png')
+    event_image = MeasuredImageField(upload_to='event/', default='event/default.png',
+                                     width_field='image_width', height_field='image_height')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     title = models.CharField(max_length=200, default="Event Title")
     description = models.TextField(default="Event description.")
     date = models.DateTimeField()
     venue = models.CharField(max_length=200, default="Event Venue")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['-date', 'id'], name='event_date_id_idx')]
 
     def __str__(self):
         return self.title
@@ -102,7 +150,10 @@ class Event(models.Model):
 
 # ----------------------------- Academic Excellence -----------------------------
 class AcademicExcellence(models.Model):
-    background_image = models.ImageField(upload_to='backgrounds/', default='backgrounds/default.jpg')
+    background_image = MeasuredImageField(upload_to='backgrounds/', default='backgrounds/default.jpg',
+                                          width_field='background_image_width', height_field='background_image_height')
+    background_image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    background_image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     heading = models.CharField(max_length=255, default="Academic Excellence At Our University")
     subheading = models.CharField(max_length=255, default="Shape Your Future Through World-Class Education")
     search_placeholder = models.CharField(max_length=255, default="Explore our academic programs...")
@@ -119,7 +170,10 @@ class Testimonial(models.Model):
     name = models.CharField(max_length=100)
     role = models.CharField(max_length=150)
     message = models.TextField()
-    image = models.ImageField(upload_to='testimonials/', default='testimonials/default.jpg')
+    image = MeasuredImageField(upload_to='testimonials/', default='testimonials/default.jpg',
+                               width_field='image_width', height_field='image_height')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"{self.name} - {self.role}"
@@ -129,10 +183,17 @@ class Testimonial(models.Model):
 class News(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(default="No description available")
-    image = models.ImageField(upload_to='news/', default='news/default.jpg')
+    image = MeasuredImageField(upload_to='news/', default='news/default.jpg',
+                               width_field='image_width', height_field='image_height')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     author = models.CharField(max_length=100, default="GCMS Admin")
     date = models.DateTimeField(default=timezone.now)
     slug = models.SlugField(unique=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['-date', 'id'], name='news_date_id_idx')]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -163,7 +224,10 @@ class Facility(models.Model):
     name = models.CharField(max_length=50, choices=LAB_CHOICES, default='programming', verbose_name='Lab Type')
     title = models.CharField(max_length=100, default='Programming Lab')
     description = models.TextField(default='This lab is equipped with modern tools and infrastructure.')
-    image = models.ImageField(upload_to='facilities/', default='facilities/default.jpg')
+    image = MeasuredImageField(upload_to='facilities/', default='facilities/default.jpg',
+                               width_field='image_width', height_field='image_height')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     feature_1 = models.CharField(max_length=200, default='30 workstations with i7 processors', blank=True, null=True)
     feature_2 = models.CharField(max_length=200, default='Latest programming tools and IDEs', blank=True, null=True)
     feature_3 = models.CharField(max_length=200, default='Interactive learning systems', blank=True, null=True)
@@ -176,7 +240,10 @@ class Facility(models.Model):
 class HostelIntro(models.Model):
     heading = models.CharField(max_length=200, default='Comfortable Living')
     description = models.TextField(default='Our hostel facilities provide a comfortable and secure environment.')
-    image = models.ImageField(upload_to='hostel/', default='hostel/default.jpg')
+    image = MeasuredImageField(upload_to='hostel/', default='hostel/default.jpg',
+                               width_field='image_width', height_field='image_height')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.heading
@@ -186,7 +253,10 @@ class HostelIntro(models.Model):
 class HostelFacility(models.Model):
     title = models.CharField(max_length=100, default='Facility Title')
     description = models.TextField(default='This is a default description for the hostel facility.')
-    image = models.ImageField(upload_to='hostel/', default='hostel/default.jpg')
+    image = MeasuredImageField(upload_to='hostel/', default='hostel/default.jpg',
+                               width_field='image_width', height_field='image_height')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     feature_1 = models.CharField(max_length=200, default='Feature One')
     feature_2 = models.CharField(max_length=200, default='Feature Two')
     feature_3 = models.CharField(max_length=200, default='Feature Three')
@@ -241,7 +311,17 @@ class LibraryBook(models.Model):
     edition = models.CharField(max_length=50, blank=True, default="1st")
     published_year = models.CharField(max_length=4, blank=True, default="2024")
     description = models.TextField(default="No description provided.")
-    image = models.ImageField(upload_to='library_books/', default='library_books/default.jpg')
+    image = MeasuredImageField(upload_to='library_books/', default='library_books/default.jpg',
+                               width_field='image_width', height_field='image_height')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['title', 'id'], name='librarybook_title_id_idx'),
+            models.Index(fields=['category', 'title', 'id'], name='librarybook_cat_title_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -299,6 +379,26 @@ from django.db import models
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+# Results released (or due) within this many days stay on the examination page;
+# older ones move to the archive.
+RECENT_RESULTS_DAYS = 180
+
+
+class ExamQuerySet(models.QuerySet):
+    def current(self):
+        """Exams that have not finished yet."""
+        return self.filter(end_date__gte=timezone.localdate())
+
+    def past(self):
+        return self.filter(end_date__lt=timezone.localdate())
+
+
+class ExamResultQuerySet(models.QuerySet):
+    def recent(self):
+        """Results released in the last RECENT_RESULTS_DAYS days or still to come."""
+        return self.filter(release_date__gte=timezone.localdate() - datetime.timedelta(days=RECENT_RESULTS_DAYS))
+
+
 class Exam(models.Model):
     title = models.CharField(max_length=200)
     department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='exams', default=1)
@@ -311,6 +411,16 @@ class Exam(models.Model):
     schedule_file = models.FileField(upload_to='exam_schedules/', blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)  # ✅ Default current datetime
 
+    objects = ExamQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_date', 'id'], name='exam_start_date_id_idx'),
+            models.Index(fields=['end_date'], name='exam_end_date_idx'),
+            # The admin's status filter lists distinct values from this index.
+            models.Index(fields=['status'], name='exam_status_idx'),
+        ]
+
     def clean(self):
         # ✅ Validation: end date must not be earlier than start date
         if self.end_date < self.start_date:
@@ -330,6 +440,14 @@ class ExamResult(models.Model):
     progress = models.PositiveIntegerField(default=0)
     result_file = models.FileField(upload_to='results/', blank=True, null=True)  # ✅ download field
 
+    objects = ExamResultQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['release_date', 'id'], name='examresult_release_id_idx'),
+            models.Index(fields=['status'], name='examresult_status_idx'),
+        ]
+
     def __str__(self):
         return f"{self.exam.title} Results"
 
@@ -342,6 +460,21 @@ class ExamResult(models.Model):
         super().save(*args, **kwargs)
 
 
+class StudentResult(models.Model):
+    """One student's row of an ExamResult sheet, filled in by gcms_sitehub.results.ingest_result_sheet."""
+    result = models.ForeignKey(ExamResult, on_delete=models.CASCADE, related_name='student_results')
+    roll_number = models.CharField(max_length=50)
+    student_name = models.CharField(max_length=200, blank=True)
+    marks = models.JSONField(default=dict)  # ✅ Remaining sheet columns, in sheet order
+
+    class Meta:
+        constraints = [
+            # Also the index behind every roll-number lookup.
+            models.UniqueConstraint(fields=['result', 'roll_number'], name='studentresult_result_roll_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.roll_number} ({self.result})"
 
 
 class Rule(models.Model):
@@ -352,6 +485,10 @@ class Rule(models.Model):
     created_at = models.DateTimeField(default=timezone.now)  # ✅ Default current datetime
     class Meta:
         ordering = ['order', 'created_at']
+        indexes = [
+            models.Index(fields=['order', 'created_at'], condition=models.Q(visible=True),
+                         name='rule_visible_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.category}"
@@ -360,7 +497,10 @@ class Rule(models.Model):
 class PhilosophyBlock(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField()
-    icon = models.ImageField(upload_to='icons/')
+    icon = MeasuredImageField(upload_to='icons/',
+                              width_field='icon_width', height_field='icon_height')
+    icon_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    icon_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.title
@@ -378,7 +518,10 @@ class HighlightSection(models.Model):
     heading = models.CharField(max_length=200)
     subheading = models.CharField(max_length=200)
     description = models.TextField()
-    background_image = models.ImageField(upload_to='backgrounds/')
+    background_image = MeasuredImageField(upload_to='backgrounds/',
+                                          width_field='background_image_width', height_field='background_image_height')
+    background_image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    background_image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     button_text = models.CharField(max_length=100)
     button_url = models.URLField()
 
@@ -404,14 +547,22 @@ class ContactMessage(models.Model):
     phone = models.CharField(max_length=20)
     subject = models.CharField(max_length=200)
     message = models.TextField()
-    date_sent = models.DateTimeField(auto_now_add=True)
+    # ✅ Set when the form is posted, so a row written later from a spool keeps it
+    date_sent = models.DateTimeField(default=timezone.now, editable=False)
+    # ✅ Sent with the form, and lets a replayed spool skip rows already written
+    idempotency_key = models.UUIDField(unique=True, null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['date_sent', 'id'], name='contactmessage_sent_id_idx')]
 
     def __str__(self):
         return f"Message from {self.name}"
 
 
 class GalleryImage(models.Model):
-    image = models.ImageField(upload_to='gallery/')
+    image = MeasuredImageField(upload_to='gallery/', width_field='image_width', height_field='image_height')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     caption = models.CharField(max_length=255, blank=True)
 
     def __str__(self):
@@ -421,6 +572,11 @@ class GalleryImage(models.Model):
 from django.db import models
 from django.db import models
 
+def current_intake():
+    """Admissions intake a new application belongs to: the current year."""
+    return str(timezone.localdate().year)
+
+
 class OnlineApplication(models.Model):
     PROGRAM_CHOICES = [
         ('ICS', 'ICS (Computer Science)'),
@@ -448,7 +604,15 @@ class OnlineApplication(models.Model):
     previous_institute = models.CharField("Previous School/College", max_length=150, default="Government School Swat")
 
     year_completed = models.PositiveIntegerField("Year Completed", default=2024)
-    created_at = models.DateTimeField(auto_now_add=True)  # No default needed — auto set
+    intake = models.CharField("Intake", max_length=20, default=current_intake)
+    superseded = models.BooleanField(
+        "Superseded", default=False,
+        help_text="A later application with the same email, program and intake replaced this one.",
+    )
+    # ✅ Sent with the form, so a double-click or retry cannot create a second row
+    idempotency_key = models.UUIDField(unique=True, null=True, blank=True, editable=False)
+    # ✅ Set when the form is posted, so a row written later from a spool keeps it
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
 
     def __str__(self):
@@ -458,6 +622,18 @@ class OnlineApplication(models.Model):
         verbose_name = "Online Application"
         verbose_name_plural = "Online Applications"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='onlineapp_created_id_idx'),
+            models.Index(fields=['program', 'created_at', 'id'], name='onlineapp_program_created_idx'),
+            models.Index(fields=['year_completed'], name='onlineapp_year_completed_idx'),
+            # The admin's intake filter; the unique constraint only covers current rows.
+            models.Index(fields=['intake'], name='onlineapp_intake_idx'),
+        ]
+        constraints = [
+            # One current application per applicant, program and intake; emails are stored lowercased.
+            models.UniqueConstraint(fields=['email', 'program', 'intake'], condition=models.Q(superseded=False),
+                                    name='onlineapp_email_program_intake_uniq'),
+        ]
 
 
 class Course(models.Model):
@@ -465,8 +641,12 @@ class Course(models.Model):
     slug = models.SlugField(unique=True, blank=True)
     description = models.TextField(default="No description available at the moment.")
     duration = models.CharField(max_length=50, default="Duration not specified")
-    image = models.ImageField(upload_to='course_images/', blank=True, null=True)
+    image = MeasuredImageField(upload_to='course_images/', blank=True, null=True,
+                               width_field='image_width', height_field='image_height')
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         # Auto-generate slug from title if not provided
@@ -0,0 +1,174 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+
+# ============================ Keyset Pagination ============================
+
+class CursorPage:
+    """One page of a CursorPaginator; iterate it like a Django Page."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginate a queryset by seeking past the last row seen instead of OFFSET.
+
+    ``ordering`` must end in a unique column (usually ``id``) and should match an
+    index, so every page is a bounded index range scan and no COUNT(*) is run.
+    Cursors are opaque tokens naming the boundary row and the direction to read.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in self.ordering
+        ]
+
+    def get_page(self, cursor=None):
+        """Return the page after (or before) ``cursor``; a bad cursor yields the first page."""
+        position = self._decode(cursor)
+        if position is None:
+            rows = list(self.queryset.order_by(*self.ordering)[:self.per_page + 1])
+            return self._page(rows, has_more=len(rows) > self.per_page, backwards=False, has_other=False)
+
+        values, backwards = position
+        queryset = self.queryset.filter(self._seek(values, backwards))
+        if backwards:
+            queryset = queryset.order_by(*self._reversed_ordering())
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        rows = list(queryset[:self.per_page + 1])
+        return self._page(rows, has_more=len(rows) > self.per_page, backwards=backwards, has_other=True)
+
+    def _page(self, rows, has_more, backwards, has_other):
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_previous, has_next = has_more, has_other
+        else:
+            has_previous, has_next = has_other, has_more
+        return CursorPage(
+            rows,
+            next_cursor=self._encode(rows[-1], backwards=False) if rows and has_next else None,
+            previous_cursor=self._encode(rows[0], backwards=True) if rows and has_previous else None,
+        )
+
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+
+    def _seek(self, values, backwards):
+        # (a, b) after (x, y)  ==  a > x OR (a = x AND b > y), with > flipped for
+        # descending columns and again when reading backwards.
+        condition = Q()
+        for index, (name, descending) in enumerate(self.fields):
+            lookup = 'lt' if descending != backwards else 'gt'
+            term = Q(**{f'{name}__{lookup}': values[index]})
+            for prior, (prior_name, _) in enumerate(self.fields[:index]):
+                term &= Q(**{prior_name: values[prior]})
+            condition |= term
+        # Repeat the bound on the leading column alone so the database can
+        # range-scan the index instead of merging one scan per OR branch.
+        name, descending = self.fields[0]
+        lookup = 'lte' if descending != backwards else 'gte'
+        return Q(**{f'{name}__{lookup}': values[0]}) & condition
+
+    def _encode(self, row, backwards):
+        values = [getattr(row, name) for name, _ in self.fields]
+        # str() keeps full microsecond precision, unlike DjangoJSONEncoder.
+        payload = json.dumps({'v': values, 'b': backwards}, default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def _decode(self, cursor):
+        if not cursor:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            opts = self.queryset.model._meta
+            values = [
+                opts.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, payload['v'], strict=True)
+            ]
+            return values, bool(payload['b'])
+        except (ValueError, TypeError, KeyError, ValidationError):
+            return None
+
+
+# ============================ Estimated Counts ============================
+
+# Below this many rows an exact COUNT(*) is cheap and always right.
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Return the planner's row estimate for ``model``'s table, or None when unknown.
+
+    Reads ``pg_class.reltuples`` on PostgreSQL and the ``sqlite_stat1`` table
+    that ``ANALYZE`` maintains on SQLite (run ``analyze_database`` to fill it).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            elif connection.vendor == 'sqlite':
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table])
+            else:
+                return None
+            rows = cursor.fetchall()
+    except DatabaseError:
+        return None
+    if not rows:
+        return None
+    # SQLite keeps one row per index, led by the rows it covers; a partial
+    # index covers fewer. The largest is a full index or, when there is none,
+    # the table's own row (idx IS NULL).
+    estimate = max(int(str(row[0]).split()[0]) for row in rows)
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that skips COUNT(*) over a whole large table.
+
+    Unfiltered querysets use the database's row estimate once it passes
+    ESTIMATED_COUNT_THRESHOLD; filtered ones are still counted exactly, since
+    filters (ideally on indexed columns) keep those counts small.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
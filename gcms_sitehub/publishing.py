@@ -0,0 +1,72 @@
+from django.core.exceptions import ValidationError
+from django.db import router
+
+from .caching import bump_model_version
+from .db import atomic_with_retry
+from .models import Exam, ExamResult
+
+# Rows per INSERT when a batch is written.
+PUBLISH_BATCH_SIZE = 500
+
+
+class PublishReport:
+    """Outcome of publish_results: the created results and the errors per input row."""
+
+    def __init__(self):
+        self.created = []
+        self.errors = {}
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def error_messages(self, labels=None):
+        """Yield ``'Row N: message'`` lines; ``labels`` maps row index to a better name than N."""
+        labels = labels or {}
+        for index, messages in sorted(self.errors.items()):
+            for message in messages:
+                yield f'{labels.get(index, f"Row {index + 1}")}: {message}'
+
+
+def publish_results(rows, *, partial=False, batch_size=PUBLISH_BATCH_SIZE):
+    """
+    Validate and create many ExamResults at once.
+
+    ``rows`` are dicts of ExamResult field values with ``exam`` given as an Exam
+    or its id. The exams are loaded in one query and every row is validated in
+    memory, with the same checks ExamResult.save() runs through full_clean(),
+    minus its per-row foreign-key query. Valid rows are then inserted with
+    bulk_create in one transaction. By default nothing is written if any row is
+    invalid; with ``partial=True`` the valid rows are written anyway.
+    """
+    rows = list(rows)
+    exam_ids = {row['exam'].pk if isinstance(row['exam'], Exam) else row['exam'] for row in rows}
+    exams = Exam.objects.only('id', 'title', 'end_date').in_bulk(exam_ids)
+
+    report = PublishReport()
+    results = []
+    for index, row in enumerate(rows):
+        values = dict(row)
+        exam_id = values.pop('exam')
+        exam = exams.get(exam_id.pk if isinstance(exam_id, Exam) else exam_id)
+        if exam is None:
+            report.errors[index] = [f'Exam {exam_id} does not exist.']
+            continue
+        result = ExamResult(exam=exam, **values)
+        try:
+            # full_clean() as in save(), minus the exam lookup done above. clean()
+            # compares dates, so it only runs once the fields have been converted.
+            result.clean_fields(exclude={'exam'})
+            result.clean()
+        except ValidationError as error:
+            report.errors[index] = error.messages
+            continue
+        results.append(result)
+
+    if results and (partial or report.ok):
+        report.created = atomic_with_retry(
+            ExamResult.objects.bulk_create, using=router.db_for_write(ExamResult),
+        )(results, batch_size=batch_size)
+        # bulk_create sends no post_save, so cached pages and streams are told here.
+        bump_model_version(ExamResult)
+    return report
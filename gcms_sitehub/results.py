@@ -0,0 +1,177 @@
+import codecs
+import csv
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+
+from .caching import bump_model_version, get_model_versions
+from .models import ExamResult, StudentResult
+
+# Rows inserted per INSERT while a sheet is ingested.
+INGEST_BATCH_SIZE = 500
+
+# How long one student's looked-up row stays cached; ingesting retires it sooner.
+RESULT_LOOKUP_TIMEOUT = 60 * 60
+
+# Normalised header text that marks the roll-number and name columns.
+ROLL_NUMBER_HEADERS = {'rollnumber', 'rollno', 'roll', 'studentid', 'registrationno', 'regno'}
+STUDENT_NAME_HEADERS = {'name', 'studentname', 'fullname'}
+
+_SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_CELL_COLUMN = re.compile(r'[A-Z]+')
+
+
+# ============================ Sheet Reading ============================
+
+def normalize_roll_number(value):
+    """Canonical form of a roll number, as typed by a student or read from a sheet."""
+    value = re.sub(r'\s+', '', str(value)).upper()
+    # Spreadsheets store numeric roll numbers as floats.
+    return value[:-2] if re.fullmatch(r'\d+\.0', value) else value
+
+
+def _column_index(reference):
+    index = 0
+    for letter in _CELL_COLUMN.match(reference).group():
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def _read_csv(handle):
+    yield from csv.reader(codecs.iterdecode(handle, 'utf-8-sig'))
+
+
+def _read_xlsx(handle):
+    """Yield the first worksheet's rows as lists of strings, streaming the XML."""
+    with zipfile.ZipFile(handle) as workbook:
+        shared = []
+        if 'xl/sharedStrings.xml' in workbook.namelist():
+            with workbook.open('xl/sharedStrings.xml') as part:
+                for _, element in iterparse(part):
+                    if element.tag == f'{_SHEET_NS}si':
+                        shared.append(''.join(text.text or '' for text in element.iter(f'{_SHEET_NS}t')))
+                        element.clear()
+        sheets = sorted(
+            name for name in workbook.namelist()
+            if posixpath.dirname(name) == 'xl/worksheets' and name.endswith('.xml')
+        )
+        if not sheets:
+            raise ValidationError('The workbook has no worksheet.')
+        with workbook.open(sheets[0]) as part:
+            for _, element in iterparse(part):
+                if element.tag != f'{_SHEET_NS}row':
+                    continue
+                row = []
+                for cell in element.iter(f'{_SHEET_NS}c'):
+                    kind = cell.get('t')
+                    if kind == 'inlineStr':
+                        value = ''.join(text.text or '' for text in cell.iter(f'{_SHEET_NS}t'))
+                    else:
+                        value = cell.findtext(f'{_SHEET_NS}v') or ''
+                        if kind == 's' and value:
+                            value = shared[int(value)]
+                    if cell.get('r'):
+                        row.extend([''] * (_column_index(cell.get('r')) - len(row)))
+                    row.append(value)
+                element.clear()
+                yield row
+
+
+def read_result_sheet(field_file):
+    """Yield the rows of an uploaded .csv or .xlsx result sheet."""
+    extension = posixpath.splitext(field_file.name)[1].lower()
+    if extension not in ('.csv', '.xlsx'):
+        raise ValidationError(f'Result sheets must be .csv or .xlsx files, not {extension or "untyped"}.')
+    with field_file.open('rb') as handle:
+        yield from (_read_csv(handle) if extension == '.csv' else _read_xlsx(handle))
+
+
+# ============================ Ingest ============================
+
+def _header_key(text):
+    return re.sub(r'[^a-z]', '', str(text).lower())
+
+
+def ingest_result_sheet(exam_result, batch_size=INGEST_BATCH_SIZE):
+    """
+    Replace the StudentResult rows of ``exam_result`` with those in its result_file.
+
+    The first row is the header: the roll-number column (and a name column, if
+    any) are recognised by name and every other column is stored in ``marks``.
+    Returns ``(rows_created, skipped)``, where ``skipped`` lists a message for
+    each row without a roll number or repeating one.
+    """
+    if not exam_result.result_file:
+        raise ValidationError('This result has no result sheet to ingest.')
+
+    rows = read_result_sheet(exam_result.result_file)
+    header = [cell.strip() for cell in next(rows, [])]
+    keys = [_header_key(cell) for cell in header]
+    try:
+        roll_column = next(index for index, key in enumerate(keys) if key in ROLL_NUMBER_HEADERS)
+    except StopIteration:
+        raise ValidationError('The result sheet has no roll number column.')
+    name_column = next((index for index, key in enumerate(keys) if key in STUDENT_NAME_HEADERS), None)
+    mark_columns = [
+        (index, label) for index, label in enumerate(header)
+        if label and index not in (roll_column, name_column)
+    ]
+
+    students, seen, skipped = [], set(), []
+    for line, row in enumerate(rows, start=2):
+        row = row + [''] * (len(header) - len(row))
+        roll_number = normalize_roll_number(row[roll_column])
+        if not roll_number:
+            if any(cell.strip() for cell in row):
+                skipped.append(f'Row {line}: no roll number.')
+            continue
+        if roll_number in seen:
+            skipped.append(f'Row {line}: roll number {roll_number} appears more than once.')
+            continue
+        seen.add(roll_number)
+        students.append(StudentResult(
+            result=exam_result,
+            roll_number=roll_number,
+            student_name=row[name_column].strip() if name_column is not None else '',
+            marks={label: row[index].strip() for index, label in mark_columns},
+        ))
+
+    with transaction.atomic(using=router.db_for_write(StudentResult)):
+        StudentResult.objects.filter(result=exam_result).delete()
+        StudentResult.objects.bulk_create(students, batch_size=batch_size)
+    # bulk_create sends no post_save, so cached lookups are retired here.
+    bump_model_version(StudentResult)
+    return len(students), skipped
+
+
+# ============================ Lookup ============================
+
+def lookup_student_result(result_id, roll_number):
+    """
+    Return ``{'roll_number', 'student_name', 'marks'}`` for one student of a
+    released result, or None.
+
+    Answers come from the (result, roll_number) unique index and are cached,
+    misses included, until an ExamResult or StudentResult changes.
+    """
+    roll_number = normalize_roll_number(roll_number)
+    if not roll_number or len(roll_number) > StudentResult._meta.get_field('roll_number').max_length:
+        return None
+    versions = '.'.join(str(version) for version in get_model_versions([ExamResult, StudentResult]))
+    key = f'gcms_sitehub:student_result:{versions}:{result_id}:{roll_number}'
+    row = cache.get(key)
+    if row is None:
+        # [:1] rather than first(): the unique index finds the row, no ORDER BY needed.
+        rows = (
+            StudentResult.objects
+            .filter(result_id=result_id, result__status='Released', roll_number=roll_number)
+            .values('roll_number', 'student_name', 'marks')[:1]
+        )
+        row = next(iter(rows), {})
+        cache.set(key, row, RESULT_LOOKUP_TIMEOUT)
+    return row or None
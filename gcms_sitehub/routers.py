@@ -0,0 +1,46 @@
+from django.conf import settings
+
+# Database alias that holds public form submissions, when it is configured.
+SUBMISSIONS_DB = 'submissions'
+
+# gcms_sitehub models written by anonymous visitors rather than editors.
+SUBMISSION_MODELS = {'contactmessage', 'onlineapplication', 'visitrequest'}
+
+
+def submissions_enabled():
+    return SUBMISSIONS_DB in settings.DATABASES
+
+
+def is_submission_model(app_label, model_name):
+    return app_label == 'gcms_sitehub' and model_name in SUBMISSION_MODELS
+
+
+class SubmissionsRouter:
+    """
+    Keep contact messages, online applications and visit requests in the
+    ``submissions`` database so their inserts never take the content
+    database's write lock. Everything else stays on ``default``.
+
+    Migration operations that do not say which model they touch (RunPython /
+    RunSQL without a ``model_name`` hint) only run on ``default``.
+    """
+
+    def _db_for_model(self, model):
+        if submissions_enabled() and is_submission_model(model._meta.app_label, model._meta.model_name):
+            return SUBMISSIONS_DB
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._db_for_model(model)
+
+    def db_for_write(self, model, **hints):
+        return self._db_for_model(model)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if not submissions_enabled():
+            return None
+        if db == SUBMISSIONS_DB:
+            return is_submission_model(app_label, model_name)
+        if is_submission_model(app_label, model_name):
+            return False
+        return None
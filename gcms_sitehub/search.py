@@ -0,0 +1,154 @@
+import hashlib
+import re
+
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count, Q
+
+from .caching import capped_timeout, get_model_versions
+from .models import LibraryBook
+
+
+# ============================ Library Full-Text Index ============================
+
+BOOK_TABLE = LibraryBook._meta.db_table
+BOOK_FTS_TABLE = f'{BOOK_TABLE}_fts'
+BOOK_FTS_COLUMNS = ('title', 'author', 'publisher', 'description')
+
+# bm25() column weights, in BOOK_FTS_COLUMNS order: a title hit outranks a description hit.
+BOOK_FTS_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+
+def _book_fts_statements():
+    columns = ', '.join(BOOK_FTS_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in BOOK_FTS_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in BOOK_FTS_COLUMNS)
+    delete_old = (
+        f"INSERT INTO {BOOK_FTS_TABLE}({BOOK_FTS_TABLE}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    insert_new = f"INSERT INTO {BOOK_FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {BOOK_FTS_TABLE} USING fts5("
+        f"{columns}, content='{BOOK_TABLE}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {BOOK_FTS_TABLE}_ai AFTER INSERT ON {BOOK_TABLE} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {BOOK_FTS_TABLE}_ad AFTER DELETE ON {BOOK_TABLE} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {BOOK_FTS_TABLE}_au AFTER UPDATE ON {BOOK_TABLE} BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def install_library_index(connection):
+    """
+    Create the FTS5 mirror of LibraryBook and its sync triggers, then rebuild it.
+
+    Safe to call repeatedly: nothing happens while the index is intact. SQLite
+    drops triggers whenever Django remakes the book table during a migration,
+    so this also runs after every ``migrate`` to restore and resync them.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    expected = {BOOK_FTS_TABLE} | {f'{BOOK_FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au')}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            [f'{BOOK_FTS_TABLE}%'],
+        )
+        if expected <= {row[0] for row in cursor.fetchall()}:
+            return
+        for statement in _book_fts_statements():
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {BOOK_FTS_TABLE}({BOOK_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall_library_index(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {BOOK_FTS_TABLE}_{suffix}')
+        cursor.execute(f'DROP TABLE IF EXISTS {BOOK_FTS_TABLE}')
+
+
+def has_library_index(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    if not hasattr(connection, '_gcms_has_library_index'):
+        connection._gcms_has_library_index = BOOK_FTS_TABLE in connection.introspection.table_names()
+    return connection._gcms_has_library_index
+
+
+# ============================ Library Search ============================
+
+def build_match_expression(query):
+    """Turn free text into an FTS5 query where every word is a quoted prefix term."""
+    terms = re.findall(r'\w+', query or '')
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_books(query, queryset=None):
+    """
+    Return books matching ``query`` ranked by BM25, each with a highlighted ``snippet``.
+
+    Uses the FTS5 index on SQLite, joined to the book table so the result stays
+    a regular queryset that can be filtered, counted and sliced. Other database
+    backends fall back to substring matching on the same columns.
+    """
+    if queryset is None:
+        queryset = LibraryBook.objects.all()
+    match = build_match_expression(query)
+    if not match:
+        return queryset
+
+    connection = connections[queryset.db]
+    if not has_library_index(connection):
+        condition = Q()
+        for column in BOOK_FTS_COLUMNS:
+            condition |= Q(**{f'{column}__icontains': query})
+        return queryset.filter(condition)
+
+    weights = ', '.join(str(weight) for weight in BOOK_FTS_WEIGHTS)
+    return queryset.extra(
+        tables=[BOOK_FTS_TABLE],
+        where=[f'{BOOK_FTS_TABLE}.rowid = {BOOK_TABLE}.id', f'{BOOK_FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={
+            'rank': f'bm25({BOOK_FTS_TABLE}, {weights})',
+            'snippet': f"snippet({BOOK_FTS_TABLE}, -1, char(2), char(3), '…', 24)",
+        },
+        order_by=['rank', 'id'],
+    )
+
+
+# ============================ Library Facets ============================
+
+def library_facets(query=''):
+    """
+    Return ``{'label', 'slug', 'count'}`` for each category among the books matching ``query``.
+
+    Counts come from one GROUP BY over the search results and are cached per
+    query until a LibraryBook changes, for at most PAGE_CACHE_TIMEOUT.
+    """
+    digest = hashlib.md5((query or '').encode()).hexdigest()
+    version, = get_model_versions([LibraryBook])
+    key = f'gcms_sitehub:library_facets:{digest}:{version}'
+    facets = cache.get(key)
+    if facets is None:
+        labels = dict(LibraryBook.CATEGORY_CHOICES)
+        rows = (
+            search_books(query)
+            .order_by()
+            .values('category')
+            .annotate(count=Count('id'))
+            .order_by('category')
+        )
+        facets = [
+            {'label': labels.get(row['category'], row['category']), 'slug': row['category'], 'count': row['count']}
+            for row in rows
+            if row['category']
+        ]
+        cache.set(key, facets, capped_timeout())
+    return facets
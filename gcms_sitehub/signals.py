@@ -0,0 +1,68 @@
+from django.db import connections, router, transaction
+from django.db.models.signals import post_delete, post_init, post_migrate, post_save
+from django.dispatch import receiver
+
+from .caching import bump_model_version, invalidate_footer_gallery
+from .images import RESPONSIVE_IMAGE_FIELDS, schedule_derivatives
+from .models import GalleryImage, LibraryBook
+from .search import install_library_index
+
+
+# ============================ Page Cache Versions ============================
+
+@receiver(post_save)
+@receiver(post_delete)
+def content_changed(sender, using, **kwargs):
+    if sender._meta.app_label == 'gcms_sitehub':
+        # Until the admin's transaction commits, a page rendered under the new
+        # version would still hold the old rows.
+        transaction.on_commit(lambda: bump_model_version(sender), using=using)
+
+
+# ============================ Responsive Images ============================
+
+def _image_fields(sender):
+    return [field_name for label, field_name in RESPONSIVE_IMAGE_FIELDS if sender._meta.label == label]
+
+
+def _stored_name(value):
+    return getattr(value, 'name', value)
+
+
+@receiver(post_init)
+def image_loaded(sender, instance, **kwargs):
+    fields = _image_fields(sender)
+    if fields:
+        # Deferred fields are left out: they cannot change without being loaded.
+        instance._gcms_image_names = {
+            field_name: _stored_name(instance.__dict__[field_name])
+            for field_name in fields if field_name in instance.__dict__
+        }
+
+
+@receiver(post_save)
+def image_saved(sender, instance, created, **kwargs):
+    for field_name in _image_fields(sender):
+        if field_name not in instance.__dict__:
+            continue
+        name = getattr(instance, field_name).name
+        # Text-only edits keep the stored name, and so the derivatives made for it.
+        if created or instance._gcms_image_names.get(field_name) != name:
+            schedule_derivatives(name, sender)
+        instance._gcms_image_names[field_name] = name
+
+
+# ============================ Footer Gallery ============================
+
+@receiver(post_save, sender=GalleryImage)
+@receiver(post_delete, sender=GalleryImage)
+def gallery_image_changed(sender, using, **kwargs):
+    transaction.on_commit(invalidate_footer_gallery, using=using)
+
+
+# ============================ Library Search Index ============================
+
+@receiver(post_migrate)
+def reinstall_library_index(sender, using, **kwargs):
+    if sender.name == 'gcms_sitehub' and router.allow_migrate_model(using, LibraryBook):
+        install_library_index(connections[using])
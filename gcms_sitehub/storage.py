@@ -0,0 +1,210 @@
+import hashlib
+import io
+import os
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage
+from PIL import Image, ImageOps
+
+from .assets import BUNDLES, COMPRESSIBLE_EXTENSIONS, build_bundle, compress
+
+
+# ============================ Upload Normalization ============================
+
+# Longest edge, in px, an uploaded image is scaled down to.
+IMAGE_UPLOAD_MAX_EDGE = getattr(settings, 'IMAGE_UPLOAD_MAX_EDGE', 2560)
+
+NORMALIZED_FORMATS = {
+    '.jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+    '.jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+    '.png': ('PNG', {'optimize': True}),
+    '.webp': ('WEBP', {'quality': 82, 'method': 6}),
+}
+
+
+def color_profile(original, image):
+    """
+    The ICC profile ``image`` should be saved with: the one ``original`` carried,
+    so wide-gamut (Display P3, Adobe RGB) photos keep their colours, unless the
+    CMYK pixels it describes were converted to RGB.
+    """
+    if original.mode == 'CMYK' and image.mode != 'CMYK':
+        return None
+    return original.info.get('icc_profile')
+
+
+def normalize_image(name, content):
+    """
+    Return ``content`` auto-oriented, stripped of all metadata but its colour
+    profile, capped to IMAGE_UPLOAD_MAX_EDGE and re-encoded; non-images come
+    back untouched.
+
+    The re-encoded file is kept whenever it fixed something (orientation, size,
+    EXIF/XMP) or came out smaller, so already-optimised uploads are not bloated.
+    """
+    image_format, options = NORMALIZED_FORMATS.get(os.path.splitext(name)[1].lower(), (None, None))
+    if image_format is None:
+        return content
+
+    try:
+        content.seek(0)
+        original = Image.open(content)
+        original.load()
+    except (OSError, ValueError):
+        content.seek(0)
+        return content
+
+    had_metadata = bool(original.getexif()) or 'xmp' in original.info
+    image = ImageOps.exif_transpose(original)
+    rotated = image is not original
+    resized = max(image.size) > IMAGE_UPLOAD_MAX_EDGE
+    if resized:
+        image.thumbnail((IMAGE_UPLOAD_MAX_EDGE, IMAGE_UPLOAD_MAX_EDGE), Image.Resampling.LANCZOS)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, icc_profile=color_profile(original, image), **options)
+    if not (rotated or resized or had_metadata) and buffer.tell() >= content.size:
+        content.seek(0)
+        return content
+    return ContentFile(buffer.getvalue(), name=content.name)
+
+
+class OptimizedFileSystemStorage(FileSystemStorage):
+    """Media storage that normalizes raster images as they are written."""
+
+    def _save(self, name, content):
+        return super()._save(name, normalize_image(name, content))
+
+
+# ============================ Content-Addressed Storage ============================
+
+CONTENT_ADDRESSED_PREFIX = 'cas'
+
+# One year: a content-addressed URL is never reused for different bytes.
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+# Set while ContentAddressedStorage writes a file, see get_available_name().
+_writing = ContextVar('gcms_sitehub_cas_writing', default=False)
+
+
+def is_content_addressed(name):
+    return name.startswith((f'{CONTENT_ADDRESSED_PREFIX}/', f'derivatives/{CONTENT_ADDRESSED_PREFIX}/'))
+
+
+def content_address(content, extension):
+    """Return the storage name derived from the SHA-256 of ``content``."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    digest = digest.hexdigest()
+    return f'{CONTENT_ADDRESSED_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}'
+
+
+class ContentAddressedStorage(OptimizedFileSystemStorage):
+    """
+    Media storage that names every file after the hash of its (normalized) bytes.
+
+    Identical uploads collapse onto one file whatever their original name or
+    model, and a URL can never change content, so MEDIA_URL/cas/ (and the
+    derivatives built from it) may be served with
+    ``Cache-Control: public, max-age=31536000, immutable``; with nginx::
+
+        location ~ ^/media/(derivatives/)?cas/ {
+            add_header Cache-Control "public, max-age=31536000, immutable";
+        }
+
+    Because files are shared between rows, delete() leaves them in place.
+    """
+
+    def _save(self, name, content):
+        content = normalize_image(name, content)
+        name = content_address(content, os.path.splitext(name)[1])
+        if self.exists(name):
+            return name
+        token = _writing.set(True)
+        try:
+            return FileSystemStorage._save(self, name, content)
+        except FileExistsError:
+            # Another upload of the same bytes wrote it since exists() was checked.
+            return name
+        finally:
+            _writing.reset(token)
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is chosen from the content in _save(), and an existing
+        # file with that name is the same file. FileSystemStorage._save() asks
+        # again when it finds the file already there; stop its retry loop.
+        if _writing.get():
+            raise FileExistsError(name)
+        return name
+
+    def delete(self, name):
+        pass
+
+
+# ============================ Static Bundles ============================
+
+class BundledManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also builds the asset bundles and precompresses output.
+
+    During ``collectstatic`` every bundle in ``gcms_sitehub.assets.BUNDLES`` is
+    concatenated and minified into STATIC_ROOT, then fingerprinted and has its
+    url()s rewritten like any other file. Each hashed CSS/JS/SVG file then gets
+    ``.gz`` (and, with brotli installed, ``.br``) siblings. Hashed names never
+    change content, so they can be served with far-future headers; with nginx::
+
+        location /static/ {
+            gzip_static on;
+            brotli_static on;
+            expires max;
+            add_header Cache-Control "public, immutable";
+        }
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for name in BUNDLES:
+                self._replace(name, build_bundle(name).encode())
+                paths[name] = (self, name)
+
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+        if not dry_run:
+            for hashed_name in set(self.hashed_files.values()):
+                if not hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                    continue
+                with self.open(hashed_name) as original:
+                    content = original.read()
+                for suffix, compressed in compress(content).items():
+                    self._replace(hashed_name + suffix, compressed)
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Templates also link files the theme never shipped (html5shiv, ...);
+            # render their plain URL rather than failing the page.
+            return name
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def convert(matchobj):
+            try:
+                return converter(matchobj)
+            except ValueError:
+                # Same for missing files referenced from the theme's CSS.
+                return matchobj.group(0)
+        return convert
+
+    def _replace(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(content))
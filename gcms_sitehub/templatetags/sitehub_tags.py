@@ -0,0 +1,63 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import escape, format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from ..assets import BUNDLES
+from ..images import srcset
+from ..search import SNIPPET_END, SNIPPET_START
+
+register = template.Library()
+
+
+@register.filter
+def highlight_snippet(value):
+    """Escape a search snippet and wrap its matched terms in <mark>."""
+    html = escape(value or '')
+    return mark_safe(html.replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>'))
+
+
+@register.simple_tag
+def responsive_image(image, sizes='100vw', **attrs):
+    """
+    Render ``image`` (an ImageField value) as a <picture> with WebP and JPEG srcsets.
+
+    Falls back to a plain <img> of the original until derivatives have been
+    generated. The width and height recorded by MeasuredImageField let the
+    browser reserve the image's box before it loads. Extra keyword arguments
+    become attributes of the <img>.
+    """
+    if not image:
+        return ''
+    attrs.setdefault('loading', 'lazy')
+    width = getattr(image.instance, image.field.width_field or '', None)
+    height = getattr(image.instance, image.field.height_field or '', None)
+    if width and height:
+        attrs.setdefault('width', width)
+        attrs.setdefault('height', height)
+    attributes = format_html_join(' ', '{}="{}"', sorted(attrs.items()))
+    webp_srcset = srcset(image.name, 'webp')
+    if not webp_srcset:
+        return format_html('<img src="{}" {}>', image.url, attributes)
+    return format_html(
+        '<picture style="display: contents">'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" {}>'
+        '</picture>',
+        webp_srcset, sizes, image.url, srcset(image.name, 'jpg'), sizes, attributes,
+    )
+
+
+@register.simple_tag
+def bundle(name):
+    """
+    Emit the tag loading asset bundle ``name`` (e.g. ``'site.js'``).
+
+    With STATIC_BUNDLES_ENABLED off (the default under DEBUG) the bundle's
+    source files are linked one by one instead, so no collectstatic is needed.
+    """
+    path = f'bundles/{name}'
+    sources = [path] if getattr(settings, 'STATIC_BUNDLES_ENABLED', False) else BUNDLES[path]
+    template = '<link rel="stylesheet" href="{}" />' if name.endswith('.css') else '<script src="{}"></script>'
+    return format_html_join('\n', template, ((static(source),) for source in sources))
@@ -1,3 +1,723 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import io
+import json
+import os
+import re
+import tempfile
+import uuid
+import zipfile
+from contextlib import ExitStack
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.apps import apps
+from django.core import serializers
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, transaction
+from django.db import models
+from django.db.models.sql.compiler import SQLInsertCompiler
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+from django.utils import timezone
+from PIL import Image, ImageCms
+
+from .management.commands.check_query_plans import FULL_SCAN, TEMP_SORT, hot_queries
+from . import images, live
+from .caching import bump_model_version, get_model_versions
+from .downloads import RangeNotSatisfiable, parse_range, serve_download
+from .exports import stream_csv, stream_xlsx
+from .forms import OnlineApplicationForm
+from .pagination import CursorPaginator, estimated_row_count
+from .publishing import publish_results
+from .results import ingest_result_sheet, lookup_student_result
+from .search import SNIPPET_END, SNIPPET_START, has_library_index, search_books
+from .storage import ContentAddressedStorage, content_address, normalize_image
+from .writers import BatchWriter, fcntl
+from .models import (
+    ContactMessage, Department, Event, Exam, ExamResult, FacultyMember, LibraryBook, MeasuredImageField, News,
+    OnlineApplication, PrincipalMessage, Rule, StudentResult,
+)
+
+# A table named in FROM or JOIN, with the alias Django gives it in subqueries and joins.
+TABLE_ALIAS = re.compile(r'(?:FROM|JOIN) "(\w+)"(?: ([A-Z]\d+)\b)?')
+
+
+@override_settings(
+    PAGE_CACHE_ENABLED=False,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class HotQueryPlanTests(TestCase):
+    """
+    Render the public list pages and the large admin changelists, and EXPLAIN
+    every query they ran against a table check_query_plans covers. The test
+    tables are never ANALYZEd, so SQLite plans them as if they were large.
+    """
+
+    databases = '__all__'
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        today = timezone.localdate()
+        department = Department.objects.create(name='Computer Science')
+        # More rows than a changelist page, so the admin queries are LIMITed as in production.
+        days = range(-60, 60)
+        Event.objects.bulk_create(Event(title=f'Event {day}', date=now + datetime.timedelta(days=day)) for day in days)
+        News.objects.bulk_create(
+            News(title=f'News {day}', slug=f'news-{day}', date=now + datetime.timedelta(days=day)) for day in days
+        )
+        LibraryBook.objects.bulk_create(LibraryBook(title=f'Book {day}', category='cs') for day in days)
+        exams = Exam.objects.bulk_create(
+            Exam(
+                title=f'Exam {day}', department=department,
+                start_date=today + datetime.timedelta(days=day * 7),
+                end_date=today + datetime.timedelta(days=day * 7 + 5),
+                time='9:00', venue='Hall', instructions='-', status='Scheduled',
+            )
+            for day in days
+        )
+        results = ExamResult.objects.bulk_create(
+            ExamResult(exam=exam, status='Released', release_date=exam.end_date + datetime.timedelta(days=10))
+            for exam in exams
+        )
+        StudentResult.objects.bulk_create(
+            StudentResult(result=results[-1], roll_number=str(1000 + number), marks={'Total': '80'})
+            for number in range(len(results))
+        )
+        Rule.objects.bulk_create(Rule(content=f'Rule {number}', order=number) for number in range(10))
+        OnlineApplication.objects.bulk_create(
+            OnlineApplication(full_name='Applicant', email=f'applicant{day}@example.com', phone='1') for day in days
+        )
+        ContactMessage.objects.bulk_create(
+            ContactMessage(name='Visitor', email='visitor@example.com', phone='1', subject='-', message='-')
+            for day in days
+        )
+        cls.result = results[-1]
+        cls.admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.hot_tables = {queryset.model._meta.db_table for queryset in hot_queries().values()}
+
+    def assertIndexedPlans(self, url):
+        """GET ``url`` and fail on any full scan of, or LIMITed temp sort over, a hot table."""
+        with ExitStack() as stack:
+            captured = [stack.enter_context(CaptureQueriesContext(connection)) for connection in connections.all()]
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+
+        for context in captured:
+            for query in context.captured_queries:
+                sql = query['sql']
+                tables = {alias or table: table for table, alias in TABLE_ALIAS.findall(sql)}
+                if not sql.startswith('SELECT') or not self.hot_tables & set(tables.values()):
+                    continue
+                with context.connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                    plan = '\n'.join(row[-1] for row in cursor.fetchall())
+                limited = ' LIMIT ' in sql
+                problems = [
+                    f'full scan of {tables.get(name, name)}' for name in FULL_SCAN.findall(plan)
+                    if tables.get(name, name) in self.hot_tables
+                    # Walking the table in id order stops at the LIMIT.
+                    and not (limited and TEMP_SORT not in plan
+                             and f'ORDER BY "{tables.get(name, name)}"."id"' in sql)
+                ]
+                # Unbounded queries return every row they sort; a LIMIT should stop early.
+                if TEMP_SORT in plan and limited:
+                    problems.append('sort without an index')
+                with self.subTest(url=url, sql=sql):
+                    self.assertEqual(problems, [], f'{url}\n{sql}\n{plan}')
+        return response
+
+    def next_page(self, url, name):
+        page = self.assertIndexedPlans(url).context[name]
+        self.assertTrue(page.has_next())
+        separator = '&' if '?' in url else '?'
+        self.assertIndexedPlans(f'{url}{separator}cursor={page.next_cursor}')
+
+    def test_public_pages(self):
+        for category in ('', 'expired', 'happening', 'upcoming'):
+            self.assertIndexedPlans(f"{reverse('event_list')}?category={category}")
+        self.next_page(reverse('event_list'), 'events')
+        self.next_page(reverse('news_list'), 'news')
+        self.next_page(reverse('library_home'), 'books')
+        self.next_page(f"{reverse('library_home')}?category=cs", 'books')
+        self.assertIndexedPlans(reverse('examination_info'))
+        self.assertIndexedPlans(reverse('examination_archive'))
+        self.assertIndexedPlans(f"{reverse('result_lookup', args=[self.result.pk])}?roll_number=1005")
+
+    def test_admin_changelists(self):
+        today = timezone.localdate()
+        for model, query in [
+            (OnlineApplication, ''),
+            (OnlineApplication, '?program__exact=ICS'),
+            (ContactMessage, ''),
+            (Exam, ''),
+            (Exam, f'?start_date__year={today.year}'),
+            (ExamResult, ''),
+            (ExamResult, f'?release_date__year={today.year}'),
+            (StudentResult, ''),
+        ]:
+            self.assertIndexedPlans(f"{reverse(f'admin:gcms_sitehub_{model._meta.model_name}_changelist')}{query}")
+
+
+@override_settings(
+    PAGE_CACHE_ENABLED=True,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class PageCacheTests(TestCase):
+    """Cached pages are retired by edits, but only once those edits are committed."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_edit_retires_page_after_commit(self):
+        url = reverse('news_list')
+        News.objects.create(title='Old headline', slug='old', date=timezone.now())
+        self.assertContains(self.client.get(url), 'Old headline')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                News.objects.create(title='New headline', slug='new', date=timezone.now())
+                # A request racing the commit must not cache under the new version.
+                self.assertNotContains(self.client.get(url), 'New headline')
+            self.assertNotContains(self.client.get(url), 'New headline')
+        self.assertContains(self.client.get(url), 'New headline')
+
+
+@override_settings(
+    PAGE_CACHE_ENABLED=False,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class ConditionalPageTests(TestCase):
+    """Detail pages answer 304 only while neither they nor their related rows changed."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_if_modified_since_sees_new_faculty_member(self):
+        department = Department.objects.create(name='Physics', slug='physics')
+        url = reverse('department_detail', args=[department.slug])
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        since = http_date(department.updated_at.timestamp() + 60)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FacultyMember.objects.create(department=department, name='Dr. New Lecturer', subject='Optics')
+        response = self.client.get(url, headers={'if-modified-since': since})
+        self.assertContains(response, 'Dr. New Lecturer')
+
+        response = self.client.get(url, headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_last_modified_without_related_models(self):
+        news = News.objects.create(title='Headline', slug='headline', date=timezone.now())
+        url = reverse('news_detail', args=[news.slug])
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, headers={'if-modified-since': last_modified}).status_code, 304)
+
+
+class RepeatApplicationTests(TestCase):
+    """A second application for the same program and intake is refused, not silently dropped."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.key = uuid.uuid4()
+        OnlineApplication.objects.create(full_name='Applicant', email='applicant@example.com', phone='1',
+                                         program='ICS', idempotency_key=self.key)
+        self.data = {
+            'full_name': 'Applicant', 'email': 'Applicant@Example.com', 'phone': '1', 'address': 'Swat',
+            'program': 'ICS', 'previous_institute': 'School', 'year_completed': 2024,
+        }
+
+    def test_repeat_is_turned_away(self):
+        with mock.patch('gcms_sitehub.views.get_writer') as get_writer:
+            response = self.client.post(reverse('apply_online'), {**self.data, 'idempotency_key': uuid.uuid4()})
+        self.assertRedirects(response, reverse('admission'), fetch_redirect_response=False)
+        get_writer.assert_not_called()
+        self.assertContains(self.client.get(reverse('admission')), 'already been received')
+
+    def test_resubmitted_page_and_other_programs_pass(self):
+        self.assertTrue(OnlineApplicationForm({**self.data, 'idempotency_key': self.key}).is_valid())
+        self.assertTrue(OnlineApplicationForm({**self.data, 'program': 'DIT'}).is_valid())
+        OnlineApplication.objects.update(superseded=True)
+        self.assertTrue(OnlineApplicationForm(self.data).is_valid())
+
+
+class EstimatedRowCountTests(TestCase):
+    """analyze_database fills in the statistics estimated_row_count reads."""
+
+    databases = '__all__'
+
+    def test_partial_index_does_not_shrink_the_estimate(self):
+        # rule_visible_order_idx covers only the visible rules.
+        Rule.objects.bulk_create(Rule(content=f'Rule {number}', visible=number < 3) for number in range(10))
+        self.assertIsNone(estimated_row_count(Rule))
+        call_command('analyze_database', stdout=io.StringIO())
+        self.assertEqual(estimated_row_count(Rule), 10)
+
+
+@skipIf(fcntl is None, 'Spool files need fcntl.flock().')
+class SpoolReplayTests(TestCase):
+    """Rows left in the spool of a dead writer are written as they were submitted."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.spool_dir = directory.name
+
+    def spool(self, *instances):
+        """Leave ``instances`` behind as an unlocked spool, like a killed worker."""
+        model = type(instances[0])
+        path = os.path.join(self.spool_dir, f'{model._meta.label_lower}-{uuid.uuid4().hex}.jsonl')
+        with open(path, 'w', encoding='utf-8') as spool:
+            for instance in instances:
+                spool.write(serializers.serialize('json', [instance]) + '\n')
+        return BatchWriter(model, spool_dir=self.spool_dir)
+
+    def test_replay_keeps_the_time_a_message_was_sent(self):
+        # Spools hold JSON, which keeps milliseconds.
+        sent = (timezone.now() - datetime.timedelta(hours=3)).replace(microsecond=250000)
+        message = ContactMessage(
+            name='Visitor', email='visitor@example.com', phone='1', subject='-', message='-',
+            date_sent=sent, idempotency_key=uuid.uuid4(),
+        )
+        writer = self.spool(message)
+        self.assertEqual(writer.replay_stale_spools(), 1)
+        self.assertEqual(ContactMessage.objects.get(idempotency_key=message.idempotency_key).date_sent, sent)
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_replay_keeps_the_time_an_application_was_sent(self):
+        sent = (timezone.now() - datetime.timedelta(hours=3)).replace(microsecond=250000)
+        application = OnlineApplication(
+            full_name='Applicant', email='applicant@example.com', phone='1',
+            created_at=sent, idempotency_key=uuid.uuid4(),
+        )
+        self.assertEqual(self.spool(application).replay_stale_spools(), 1)
+        self.assertEqual(OnlineApplication.objects.get(idempotency_key=application.idempotency_key).created_at, sent)
+
+
+class ExportFormulaTests(SimpleTestCase):
+    """Text typed by visitors reaches the spreadsheet as text, never as a formula."""
+
+    payloads = ['=HYPERLINK("http://example.com","x")', '+1+1', '-2+3', '@SUM(A1)']
+
+    def test_csv_quotes_formula_prefixes(self):
+        lines = list(stream_csv(['Message'], [[payload] for payload in self.payloads] + [['plain'], [-5]]))
+        self.assertEqual(
+            [line.strip() for line in lines[1:]],
+            ['"\'=HYPERLINK(""http://example.com"",""x"")"', "'+1+1", "'-2+3", "'@SUM(A1)", 'plain', '-5'],
+        )
+
+    def test_xlsx_keeps_text_in_inline_strings(self):
+        workbook = b''.join(stream_xlsx(['Message'], [[payload] for payload in self.payloads]))
+        with zipfile.ZipFile(io.BytesIO(workbook)) as archive:
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertNotIn('<f>', sheet)
+        self.assertEqual(sheet.count('t="inlineStr"'), len(self.payloads) + 1)
+
+
+class NormalizeImageTests(SimpleTestCase):
+    """Uploads lose their EXIF but keep the colour profile their pixels are in."""
+
+    def upload(self, mode, extension):
+        profile = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+        exif = Image.Exif()
+        exif[0x0110] = 'Camera'  # Model: metadata that forces a re-encode
+        buffer = io.BytesIO()
+        Image.new(mode, (64, 48)).save(buffer, 'JPEG' if extension == '.jpg' else 'PNG', exif=exif, icc_profile=profile)
+        return profile, ContentFile(buffer.getvalue(), name=f'photo{extension}')
+
+    def test_keeps_icc_profile(self):
+        for extension in ('.jpg', '.png'):
+            profile, upload = self.upload('RGB', extension)
+            with self.subTest(extension=extension), Image.open(normalize_image(upload.name, upload)) as image:
+                self.assertFalse(image.getexif())
+                self.assertEqual(image.info.get('icc_profile'), profile)
+
+    def test_drops_cmyk_profile_of_pixels_converted_to_rgb(self):
+        _, upload = self.upload('CMYK', '.jpg')
+        with Image.open(normalize_image(upload.name, upload)) as image:
+            self.assertEqual(image.mode, 'RGB')
+            self.assertIsNone(image.info.get('icc_profile'))
+
+
+class ContentAddressedStorageTests(SimpleTestCase):
+    """Uploads of the same bytes share one file, even when they race."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = ContentAddressedStorage(location=directory.name)
+
+    def test_same_bytes_written_between_check_and_write(self):
+        content = ContentFile(b'Admission form', name='form.pdf')
+        name = content_address(content, '.pdf')
+
+        def written_meanwhile(path):
+            # The other upload lands right after this one checked.
+            os.makedirs(os.path.dirname(self.storage.path(name)), exist_ok=True)
+            with open(self.storage.path(name), 'wb') as other:
+                other.write(b'Admission form')
+            return False
+
+        with mock.patch.object(self.storage, 'exists', side_effect=written_meanwhile):
+            self.assertEqual(self.storage.save('form.pdf', content), name)
+        self.assertEqual(os.listdir(os.path.dirname(self.storage.path(name))), [os.path.basename(name)])
+        # Outside a write an existing name is still handed back as is.
+        self.assertEqual(self.storage.get_available_name(name), name)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ImageDimensionTests(SimpleTestCase):
+    """Every image is rendered with its recorded size, so the page does not shift as it loads."""
+
+    def test_every_image_field_records_its_size(self):
+        for model in apps.get_app_config('gcms_sitehub').get_models():
+            for field in model._meta.get_fields():
+                if isinstance(field, models.ImageField):
+                    with self.subTest(field=f'{model.__name__}.{field.name}'):
+                        self.assertIsInstance(field, MeasuredImageField)
+                        self.assertTrue(field.width_field and field.height_field)
+
+    def test_responsive_image_emits_width_and_height(self):
+        message = PrincipalMessage(image='principal_images/p.jpg', image_width=640, image_height=480)
+        html = Template('{% load sitehub_tags %}{% responsive_image message.image alt="Principal" %}').render(
+            Context({'message': message})
+        )
+        self.assertInHTML('<img src="/media/principal_images/p.jpg" alt="Principal" height="480" loading="lazy" width="640">', html)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ImageDerivativeScheduleTests(TestCase):
+    """Derivatives are built once per stored file, not on every save of its row."""
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('gcms_sitehub.signals.schedule_derivatives')
+        self.schedule = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.news = News.objects.create(title='Open day', image='news/open-day.jpg', image_width=800, image_height=600)
+        self.schedule.reset_mock()
+
+    def test_text_edit_does_not_schedule(self):
+        self.news.title = 'Open day moved'
+        self.news.save()
+        News.objects.get(pk=self.news.pk).save()
+        News.objects.only('title').get(pk=self.news.pk).save(update_fields=['title'])
+        self.schedule.assert_not_called()
+
+    def test_new_file_is_scheduled(self):
+        news = News.objects.get(pk=self.news.pk)
+        news.image = 'news/open-day-2.jpg'
+        news.save()
+        self.schedule.assert_called_once_with('news/open-day-2.jpg', News)
+
+    def test_existing_derivatives_are_not_rebuilt(self):
+        with mock.patch('gcms_sitehub.images.available_widths', return_value=(320,)), \
+                mock.patch('gcms_sitehub.images.generate_derivatives') as generate:
+            images._generate_and_refresh('news/open-day.jpg', News)
+        generate.assert_not_called()
+
+
+class LibrarySearchTests(TestCase):
+    """The FTS5 index follows every insert, update and delete of a book."""
+
+    def titles(self, query):
+        return list(search_books(query).values_list('title', flat=True))
+
+    def test_triggers_keep_the_index_in_sync(self):
+        self.assertTrue(has_library_index(connections['default']))
+        book = LibraryBook.objects.create(title='Principles of Economics', author='Alfred Marshall')
+        LibraryBook.objects.create(title='Calculus', description='Limits and the economics of change.')
+        # Title hits rank above description hits; prefixes match.
+        self.assertEqual(self.titles('econ'), ['Principles of Economics', 'Calculus'])
+
+        book.title = 'Industry and Trade'
+        book.save()
+        self.assertEqual(self.titles('economics'), ['Calculus'])
+        self.assertEqual(self.titles('trade'), ['Industry and Trade'])
+        self.assertEqual(self.titles('marshall'), ['Industry and Trade'])
+
+        LibraryBook.objects.filter(pk=book.pk).delete()
+        self.assertEqual(self.titles('marshall'), [])
+        self.assertEqual(self.titles('economics'), ['Calculus'])
+
+    def test_snippet_marks_the_match(self):
+        LibraryBook.objects.create(title='Organic Chemistry')
+        self.assertIn(f'{SNIPPET_START}Chemistry{SNIPPET_END}', search_books('chem').get().snippet)
+
+
+class CursorPaginatorTests(TestCase):
+    """Cursors walk every row exactly once in both directions, even across tied sort keys."""
+
+    def setUp(self):
+        tied = timezone.now().replace(microsecond=123456)
+        dates = [tied, tied, tied, tied - datetime.timedelta(days=1), tied + datetime.timedelta(days=1)]
+        for number, date in enumerate(dates):
+            News.objects.create(title=f'News {number}', slug=f'news-{number}', date=date)
+        self.expected = list(News.objects.order_by('-date', 'id').values_list('pk', flat=True))
+        self.paginator = CursorPaginator(News.objects.all(), ('-date', 'id'), 2)
+
+    def test_forward_and_back(self):
+        pages = [self.paginator.get_page()]
+        self.assertFalse(pages[0].has_previous())
+        while pages[-1].has_next():
+            pages.append(self.paginator.get_page(pages[-1].next_cursor))
+        self.assertEqual([[news.pk for news in page] for page in pages], [self.expected[0:2], self.expected[2:4], self.expected[4:]])
+
+        page = pages[-1]
+        for earlier in reversed(pages[:-1]):
+            page = self.paginator.get_page(page.previous_cursor)
+            self.assertEqual([news.pk for news in page], [news.pk for news in earlier])
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+    def test_bad_cursor_yields_the_first_page(self):
+        # Not base64; then an empty JSON object.
+        for cursor in ('not-base64!', 'e30'):
+            with self.subTest(cursor=cursor):
+                self.assertEqual([news.pk for news in self.paginator.get_page(cursor)], self.expected[:2])
+
+
+class DownloadRangeTests(SimpleTestCase):
+    """Byte ranges follow RFC 9110: one span, or the whole file, or 416."""
+
+    def test_parse_range(self):
+        cases = {
+            'bytes=0-9': (0, 9),
+            'bytes=90-': (90, 99),
+            'bytes=90-500': (90, 99),
+            'bytes=-10': (90, 99),
+            'bytes=-500': (0, 99),
+            # Several ranges, or none that parse, get the whole file.
+            'bytes=0-9,20-29': None,
+            'bytes=-': None,
+            'items=0-9': None,
+            '': None,
+        }
+        for header, span in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 100), span)
+
+    def test_unsatisfiable(self):
+        for header, size in (('bytes=-0', 100), ('bytes=100-', 100), ('bytes=10-5', 100), ('bytes=-1', 0), ('bytes=0-', 0)):
+            with self.subTest(header=header, size=size), self.assertRaises(RangeNotSatisfiable):
+                parse_range(header, size)
+
+    def test_serve_download(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with open(os.path.join(directory.name, 'form.pdf'), 'wb') as handle:
+            handle.write(bytes(range(100)))
+
+        with override_settings(MEDIA_ROOT=directory.name, DOWNLOAD_OFFLOAD=None):
+            def get(**headers):
+                return serve_download(RequestFactory().get('/', headers=headers), 'form.pdf', 'Form.pdf')
+
+            response = get(Range='bytes=90-')
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response['Content-Range'], 'bytes 90-99/100')
+            self.assertEqual(b''.join(response.streaming_content), bytes(range(90, 100)))
+
+            response = get(Range='bytes=100-')
+            self.assertEqual(response.status_code, 416)
+            self.assertEqual(response['Content-Range'], 'bytes */100')
+
+            # A stale If-Range gets the whole, current file.
+            response = get(Range='bytes=90-', **{'If-Range': '"stale"'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b''.join(response.streaming_content), bytes(range(100)))
+            response.close()
+
+            self.assertEqual(get(**{'If-None-Match': response['ETag']}).status_code, 304)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ResultSheetIngestTests(TestCase):
+    """A result sheet becomes one StudentResult per roll number, replacing the last upload."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        media = override_settings(MEDIA_ROOT=directory.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        os.mkdir(os.path.join(directory.name, 'results'))
+        self.media = directory.name
+
+        today = timezone.localdate()
+        exam = Exam.objects.create(
+            title='Finals', department=Department.objects.create(name='Physics', slug='physics'),
+            start_date=today, end_date=today, time='9:00', venue='Hall', instructions='-', status='Held',
+        )
+        self.result = ExamResult.objects.create(exam=exam, status='Released', release_date=today)
+
+    def ingest(self, name, chunks):
+        with open(os.path.join(self.media, 'results', name), 'wb') as handle:
+            for chunk in chunks:
+                handle.write(chunk.encode() if isinstance(chunk, str) else chunk)
+        self.result.result_file = f'results/{name}'
+        return ingest_result_sheet(self.result)
+
+    def rows(self):
+        return list(StudentResult.objects.filter(result=self.result).order_by('roll_number').values_list(
+            'roll_number', 'student_name', 'marks',
+        ))
+
+    def test_csv(self):
+        created, skipped = self.ingest('finals.csv', stream_csv(
+            ['Roll No.', 'Student Name', 'Mechanics', 'Optics'],
+            [[' ab 12 ', 'Sana', '71', '64'], ['1001.0', 'Omar', '80', ''], ['AB12', 'Again', '1', '1'],
+             ['', 'Nobody', '50', '50'], ['', '', '', '']],
+        ))
+        self.assertEqual(created, 2)
+        self.assertEqual(skipped, ['Row 4: roll number AB12 appears more than once.', 'Row 5: no roll number.'])
+        self.assertEqual(self.rows(), [
+            ('1001', 'Omar', {'Mechanics': '80', 'Optics': ''}),
+            ('AB12', 'Sana', {'Mechanics': '71', 'Optics': '64'}),
+        ])
+        self.assertEqual(lookup_student_result(self.result.pk, 'ab12')['student_name'], 'Sana')
+
+        # A corrected sheet replaces every row, and lookups see it at once.
+        self.ingest('finals-2.csv', stream_csv(['Roll', 'Mechanics'], [['AB12', '75']]))
+        self.assertEqual(self.rows(), [('AB12', '', {'Mechanics': '75'})])
+        self.assertIsNone(lookup_student_result(self.result.pk, '1001'))
+
+    def test_xlsx(self):
+        created, skipped = self.ingest('finals.xlsx', stream_xlsx(
+            ['Registration No', 'Name', 'Grade'], [[2001, 'Hina', 'A'], [2002, 'Ali', 'B']],
+        ))
+        self.assertEqual((created, skipped), (2, []))
+        self.assertEqual(self.rows(), [('2001', 'Hina', {'Grade': 'A'}), ('2002', 'Ali', {'Grade': 'B'})])
+
+    def test_sheet_without_roll_numbers_keeps_the_old_rows(self):
+        self.ingest('finals.csv', stream_csv(['Roll', 'Grade'], [['1', 'A']]))
+        with self.assertRaises(ValidationError):
+            self.ingest('finals-2.csv', stream_csv(['Student', 'Grade'], [['1', 'B']]))
+        self.assertEqual(self.rows(), [('1', '', {'Grade': 'A'})])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ResultProgressStreamTests(TestCase):
+    """The progress stream sends recent results on connect and then only what changed."""
+
+    def setUp(self):
+        cache.clear()
+        today = timezone.localdate()
+        exam = Exam.objects.create(
+            title='Finals', department=Department.objects.create(name='Physics', slug='physics'),
+            start_date=today, end_date=today, time='9:00', venue='Hall', instructions='-', status='Held',
+        )
+        self.results = ExamResult.objects.bulk_create([
+            ExamResult(exam=exam, release_date=today, progress=10),
+            ExamResult(exam=exam, release_date=today, progress=20),
+            # Long past: not on the examination page, so not streamed.
+            ExamResult(exam=exam, release_date=today - datetime.timedelta(days=365), progress=100),
+        ])
+
+    def event(self, result, progress, status='Not Released'):
+        row = {'id': result.pk, 'status': status, 'progress': progress}
+        return f'id: {result.pk}\nevent: progress\ndata: {json.dumps(row)}\n\n'
+
+    def test_wsgi_sends_one_snapshot(self):
+        response = self.client.get(reverse('result_progress'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual(
+            b''.join(response.streaming_content).decode(),
+            'retry: 10000\n\n' + self.event(self.results[0], 10) + self.event(self.results[1], 20),
+        )
+
+    async def test_watcher_fans_out_changed_rows(self):
+        watcher = live.ResultProgressWatcher()
+        streams = [live._stream(watcher), live._stream(watcher)]
+        with mock.patch.object(live, 'RESULT_STREAM_POLL_INTERVAL', 0):
+            for stream in streams:
+                self.assertEqual(
+                    [await anext(stream), await anext(stream)],
+                    [self.event(self.results[0], 10), self.event(self.results[1], 20)],
+                )
+            await ExamResult.objects.filter(pk=self.results[1].pk).aupdate(progress=60, status='Released')
+            await sync_to_async(bump_model_version)(ExamResult)
+            for stream in streams:
+                self.assertEqual(
+                    await asyncio.wait_for(anext(stream), 5), self.event(self.results[1], 60, 'Released'),
+                )
+            for stream in streams:
+                await stream.aclose()
+            # With nobody left to serve, the polling task ends.
+            self.assertEqual(watcher.subscribers, set())
+            await asyncio.wait_for(watcher.task, 5)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PublishResultsTests(TestCase):
+    """A batch of results is published whole, or not at all unless partial=True."""
+
+    def setUp(self):
+        cache.clear()
+        today = timezone.localdate()
+        department = Department.objects.create(name='Physics', slug='physics')
+        self.exams = Exam.objects.bulk_create(
+            Exam(
+                title=f'Paper {number}', department=department, start_date=today, end_date=today,
+                time='9:00', venue='Hall', instructions='-', status='Held',
+            )
+            for number in range(3)
+        )
+        self.today = today
+
+    def rows(self, *release_dates):
+        return [{'exam': exam, 'release_date': date} for exam, date in zip(self.exams, release_dates)]
+
+    def test_invalid_row_writes_nothing(self):
+        version = get_model_versions([ExamResult])
+        rows = self.rows(self.today, self.today - datetime.timedelta(days=1), self.today)
+        rows.append({'exam': 0, 'release_date': self.today})
+        report = publish_results(rows)
+        self.assertFalse(report.ok)
+        self.assertEqual(list(report.error_messages({3: 'Missing exam'})), [
+            "Row 2: Release date cannot be before the exam's end date.",
+            'Missing exam: Exam 0 does not exist.',
+        ])
+        self.assertEqual(report.created, [])
+        self.assertFalse(ExamResult.objects.exists())
+        self.assertEqual(get_model_versions([ExamResult]), version)
+
+    def test_partial_writes_the_valid_rows(self):
+        version = get_model_versions([ExamResult])
+        report = publish_results(self.rows(self.today, self.today - datetime.timedelta(days=1), self.today), partial=True)
+        self.assertEqual(list(report.errors), [1])
+        self.assertEqual(
+            sorted(ExamResult.objects.values_list('exam_id', flat=True)), [self.exams[0].pk, self.exams[2].pk],
+        )
+        self.assertNotEqual(get_model_versions([ExamResult]), version)
+
+    def test_failed_insert_rolls_back_earlier_batches(self):
+        insert = SQLInsertCompiler.execute_sql
+        calls = []
+
+        def fail_second_batch(compiler, *args, **kwargs):
+            calls.append(compiler)
+            if len(calls) == 2:
+                raise IntegrityError('disk full')
+            return insert(compiler, *args, **kwargs)
+
+        with mock.patch.object(SQLInsertCompiler, 'execute_sql', fail_second_batch), self.assertRaises(IntegrityError):
+            publish_results(self.rows(self.today, self.today, self.today), batch_size=1)
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(ExamResult.objects.exists())
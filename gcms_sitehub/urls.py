@@ -26,6 +26,9 @@ urlpatterns = [
 
     # Examination Information Center
     path('examination-info/', views.examination_info, name='examination_info'),               # Exams schedule, results, and rules
+    path('examination-info/archive/', views.examination_archive, name='examination_archive'), # Past exam sessions and their results
+    path('examination-info/results/<int:pk>/', views.result_lookup, name='result_lookup'),   # One student's marks by roll number
+    path('examination-info/results/progress/', views.result_progress_stream, name='result_progress'),  # Live result progress (SSE)
 
     # About Us Page
     path('about/', views.about_page, name='about_page'),                                      # Institution background, principal message, etc.
@@ -43,6 +46,9 @@ urlpatterns = [
 
     path('courses/', views.course_list, name='course_list'),
     path('courses/<slug:slug>/', views.course_detail, name='course_detail'),
+
+    # Downloads
+    path('downloads/<str:kind>/<int:pk>/', views.download_file, name='download_file'),        # Admission forms, exam schedules and result sheets
  
                           
 ]
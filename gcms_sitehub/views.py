@@ -1,8 +1,18 @@
+import asyncio
+import datetime
+import uuid
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
+from django.http import Http404, JsonResponse
 from django.contrib import messages
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.db.models import Case, CharField, Exists, OuterRef, Prefetch, Value, When
 from django.utils import timezone
-from django.core.paginator import Paginator
 from django.utils.text import slugify
+from django.views.decorators.http import require_safe
+from django.core.paginator import Paginator
+from django.views.static import serve as static_serve
 
 # Import all necessary models
 from .models import (
@@ -11,75 +21,121 @@ from .models import (
     AdmissionStep, FeeStructure, ApplicationDownload,
     Exam, ExamResult, Rule, PhilosophyBlock, Statistic, HighlightSection,
     ContactInformation, ContactMessage, GalleryImage,Course,
+    FacultyMember, OnlineApplication,
 )
+from .caching import cache_public_page, conditional_page, seconds_until_local_midnight
+from .downloads import serve_download
+from .live import result_progress_response
+from .pagination import CursorPaginator
+from .results import lookup_student_result
+from .search import library_facets, search_books
+from .storage import IMMUTABLE_MAX_AGE, is_content_addressed
+from .writers import get_writer
+
+# ============================ Async Helpers ============================
+
+async def _alist(queryset):
+    """Evaluate ``queryset`` with the async ORM."""
+    return [obj async for obj in queryset]
+
+# Templates and context processors may still touch the database, so
+# async views render in a worker thread.
+_arender = sync_to_async(render)
 
 # ============================ Home Page ============================
 
-def index(request):
+@cache_public_page(PrincipalMessage, Testimonial, AcademicExcellence, Department, Facility,
+                   ContactInformation, Event, News, Course)
+async def index(request):
     """Render the homepage with dynamic content."""
+    (principal_message, testimonials, academic_excellence, departments, facilities,
+     contact_info, events, news, latest_events, courses) = await asyncio.gather(
+        PrincipalMessage.objects.afirst(),
+        _alist(Testimonial.objects.all()),
+        AcademicExcellence.objects.afirst(),
+        _alist(Department.objects.all()),
+        _alist(Facility.objects.all()),
+        ContactInformation.objects.afirst(),
+        _alist(Event.objects.all()),
+        _alist(News.objects.order_by('-date')[:6]),
+        _alist(Event.objects.order_by('-date')[:3]),
+        _alist(Course.objects.all()),
+    )
     context = {
-        'principal_message': PrincipalMessage.objects.first(),
-        'testimonials': Testimonial.objects.all(),
-        'academic_excellence': AcademicExcellence.objects.first(),
-        'departments': Department.objects.all(),
-        'facilities': Facility.objects.all(),
-        'contact_info': ContactInformation.objects.first(),
-        'events': Event.objects.all(),
-        'news': News.objects.order_by('-date')[:6],
-        'latest_events': Event.objects.order_by('-date')[:3],
-        'images': GalleryImage.objects.all(),
-        'courses' : Course.objects.all(),
-        
-       
-        
+        'principal_message': principal_message,
+        'testimonials': testimonials,
+        'academic_excellence': academic_excellence,
+        'departments': departments,
+        'facilities': facilities,
+        'contact_info': contact_info,
+        'events': events,
+        'news': news,
+        'latest_events': latest_events,
+        'courses': courses,
     }
-    return render(request, 'gcms_sitehub/index.html', context)
+    return await _arender(request, 'gcms_sitehub/index.html', context)
 
 # ============================ Department Views ============================
 
+@cache_public_page(Department)
 def department_list(request):
     """Display list of all departments."""
-    images = GalleryImage.objects.all()
     departments = Department.objects.all()
-    return render(request, 'gcms_sitehub/department.html', {'images': images, 'departments': departments})
+    return render(request, 'gcms_sitehub/department.html', {'departments': departments})
 
+@cache_public_page(Department, FacultyMember)
+@conditional_page(Department, 'slug', FacultyMember)
 def department_detail(request, slug):
     """Display detailed view of a specific department."""
     department = get_object_or_404(Department, slug=slug)
-    images = GalleryImage.objects.all()
     return render(request, 'gcms_sitehub/department_detail.html', {
-        'images': images,
         'department': department,
         'faculty_members': department.faculty_members.all()
     })
 
 # ============================ Event Views ============================
 
+def _local_day_bounds():
+    """Return the aware datetimes at which the current local day starts and ends."""
+    today = timezone.localdate()
+    start = timezone.make_aware(datetime.datetime.combine(today, datetime.time.min))
+    end = timezone.make_aware(datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time.min))
+    return start, end
+
+@cache_public_page(Event, timeout=seconds_until_local_midnight)
 def event_list(request):
-    """List all events with category (happening, upcoming, expired)."""
-    today = timezone.now().date()
-    images = GalleryImage.objects.all()
-    events = Event.objects.all().order_by('-date')
-
-    for event in events:
-        event_date = event.date.date() if hasattr(event.date, 'date') else event.date
-        if event_date == today:
-            event.category = 'happening'
-        elif event_date > today:
-            event.category = 'upcoming'
-        else:
-            event.category = 'expired'
+    """List events with category (happening, upcoming, expired), filterable by category."""
+    start, end = _local_day_bounds()
+    events = Event.objects.annotate(category=Case(
+        When(date__lt=start, then=Value('expired')),
+        When(date__gte=end, then=Value('upcoming')),
+        default=Value('happening'),
+        output_field=CharField(),
+    ))
+
+    category = request.GET.get('category', '')
+    if category == 'expired':
+        events = events.filter(date__lt=start)
+    elif category == 'upcoming':
+        events = events.filter(date__gte=end)
+    elif category == 'happening':
+        events = events.filter(date__gte=start, date__lt=end)
+    else:
+        category = ''
 
-    return render(request, 'gcms_sitehub/event.html', {'images': images, 'events': events})
+    events = CursorPaginator(events, ('-date', 'id'), 10).get_page(request.GET.get('cursor'))
+    return render(request, 'gcms_sitehub/event.html', {'events': events, 'category': category})
 
+@cache_public_page(Event)
+@conditional_page(Event, 'id')
 def event_detail(request, id):
     """Display details of a specific event."""
     event = get_object_or_404(Event, id=id)
-    images = GalleryImage.objects.all()
-    return render(request, 'gcms_sitehub/event_detail.html', {'images': images, 'event': event})
+    return render(request, 'gcms_sitehub/event_detail.html', {'event': event})
 
 # ============================ Facilities View ============================
 
+@cache_public_page(Facility, HostelIntro, HostelFacility)
 def facilities_view(request):
     """Display lab and hostel facility information."""
     labs = Facility.objects.all().order_by('name')
@@ -93,29 +149,37 @@ def facilities_view(request):
 
 # ============================ Library Views ============================
 
+@cache_public_page(LibraryBook)
 def library_home(request):
-    """Library homepage with book filters and pagination."""
-    search_query = request.GET.get('search', '')
-    books = LibraryBook.objects.filter(title__icontains=search_query)
-    images = GalleryImage.objects.all()
-
-    paginator = Paginator(books, 9)
-    books_page = paginator.get_page(request.GET.get('page'))
+    """Library homepage with search, category facets and pagination."""
+    search_query = request.GET.get('search', '').strip()
+    books = search_books(search_query)
+
+    filters = library_facets(search_query)
+    category = request.GET.get('category', '')
+    if category in dict(LibraryBook.CATEGORY_CHOICES):
+        books = books.filter(category=category)
+    else:
+        category = ''
 
-    categories = set(book.category for book in books if book.category)
-    filters = [{'name': cat, 'slug': slugify(cat)} for cat in categories]
+    if search_query:
+        # Search results are ordered by relevance, which cannot be seeked on.
+        books_page = Paginator(books, 9).get_page(request.GET.get('page'))
+    else:
+        books_page = CursorPaginator(books, ('title', 'id'), 9).get_page(request.GET.get('cursor'))
 
     return render(request, 'gcms_sitehub/library.html', {
         'books': books_page,
         'filters': filters,
-        'images': images,
+        'category': category,
     })
 
+@cache_public_page(LibraryBook)
+@conditional_page(LibraryBook, 'pk')
 def book_detail(request, pk):
     """Detail view of a specific book."""
     book = get_object_or_404(LibraryBook, pk=pk)
-    images = GalleryImage.objects.all()
-    return render(request, 'gcms_sitehub/book_detail.html', {'images': images, 'book': book})
+    return render(request, 'gcms_sitehub/book_detail.html', {'book': book})
 
 # ============================ Admission Views ============================
 
@@ -125,107 +189,185 @@ def admission_view(request):
         'steps': AdmissionStep.objects.all(),
         'fees': FeeStructure.objects.all(),
         'application': ApplicationDownload.objects.last(),
-        'images': GalleryImage.objects.all(),
+        'idempotency_key': uuid.uuid4(),
     }
     return render(request, 'gcms_sitehub/admission.html', context)
 
-from .forms import OnlineApplicationForm
+from .forms import ContactMessageForm, OnlineApplicationForm
 
 def apply_online(request):
-    """Handle the online application form."""
+    """Handle the online application form; the row is written in the background."""
     if request.method == 'POST':
         form = OnlineApplicationForm(request.POST)
         if form.is_valid():
-            form.save()
+            get_writer(OnlineApplication).submit(form.save(commit=False))
             return redirect('https://admission.hed.gkp.pk/')  # External redirect to HED
+        if form.has_error(NON_FIELD_ERRORS, 'duplicate'):
+            for error in form.non_field_errors():
+                messages.error(request, error)
+            return redirect('admission')
     else:
         form = OnlineApplicationForm()
 
-    return render(request, 'gcms_sitehub/admission.html', {'form': form})
+    return render(request, 'gcms_sitehub/admission.html', {'form': form, 'idempotency_key': uuid.uuid4()})
 
 
 # ============================ Examination Info View ============================
 
+@cache_public_page(Department, Exam, ExamResult, Rule, timeout=seconds_until_local_midnight)
 def examination_info(request):
-    """Display upcoming exams, results, and rules."""
+    """Display current and upcoming exams, recent results, and rules."""
+    current_exams = Exam.objects.current()
     context = {
-        'departments': Department.objects.prefetch_related('exams').all(),
-        'results': ExamResult.objects.select_related('exam').all(),
+        'departments': (
+            Department.objects
+            .filter(Exists(current_exams.filter(department=OuterRef('pk'))))
+            .prefetch_related(Prefetch(
+                'exams', queryset=current_exams.order_by('start_date', 'id'), to_attr='current_exams',
+            ))
+        ),
+        'results': (
+            ExamResult.objects.recent()
+            .select_related('exam__department')
+            .order_by('-release_date', '-id')
+        ),
         'rules': Rule.objects.filter(visible=True),
-        'images': GalleryImage.objects.all()
     }
     return render(request, 'gcms_sitehub/exam.html', context)
 
+@cache_public_page(Department, Exam, ExamResult, timeout=seconds_until_local_midnight)
+def examination_archive(request):
+    """Past exams with their results, newest session first."""
+    exams = (
+        Exam.objects.past()
+        .select_related('department')
+        .prefetch_related(Prefetch('examresult_set', queryset=ExamResult.objects.order_by('-release_date', '-id')))
+    )
+    exams = CursorPaginator(exams, ('-start_date', '-id'), 10).get_page(request.GET.get('cursor'))
+    return render(request, 'gcms_sitehub/exam_archive.html', {'exams': exams})
+
+@require_safe
+def result_lookup(request, pk):
+    """Return one student's marks from a released result as JSON, by roll number."""
+    row = lookup_student_result(pk, request.GET.get('roll_number', ''))
+    if row is None:
+        return JsonResponse({'error': 'No released result was found for that roll number.'}, status=404)
+    return JsonResponse(row)
+
+@require_safe
+async def result_progress_stream(request):
+    """Server-Sent Events feed of result status and progress for exam.html."""
+    return await result_progress_response(request)
+
 # ============================ About Page ============================
 
-def about_page(request):
+@cache_public_page(PrincipalMessage, PhilosophyBlock, Statistic, HighlightSection, Testimonial)
+async def about_page(request):
     """Render the About page with principal message and stats."""
+    principal, philosophy, stats, highlight, testimonials = await asyncio.gather(
+        PrincipalMessage.objects.afirst(),
+        _alist(PhilosophyBlock.objects.all()),
+        _alist(Statistic.objects.all()),
+        HighlightSection.objects.afirst(),
+        _alist(Testimonial.objects.all()),
+    )
     context = {
-        'principal': PrincipalMessage.objects.first(),
-        'philosophy': PhilosophyBlock.objects.all(),
-        'stats': Statistic.objects.all(),
-        'highlight': HighlightSection.objects.first(),
-        'testimonials': Testimonial.objects.all(),
-        'images': GalleryImage.objects.all(),
+        'principal': principal,
+        'philosophy': philosophy,
+        'stats': stats,
+        'highlight': highlight,
+        'testimonials': testimonials,
     }
-    return render(request, 'gcms_sitehub/about.html', context)
+    return await _arender(request, 'gcms_sitehub/about.html', context)
 
 # ============================ Contact Views ============================
 
 def contact_page(request):
     """Render the contact page with contact information."""
     contact_info = ContactInformation.objects.first()
-    images = GalleryImage.objects.all()
-    return render(request, 'gcms_sitehub/contact.html', {'contact_info': contact_info, 'images': images})
+    return render(request, 'gcms_sitehub/contact.html', {
+        'contact_info': contact_info,
+        'idempotency_key': uuid.uuid4(),
+    })
 
 def submit_contact_message(request):
-    """Handle contact form submission."""
+    """Handle contact form submission; the message is spooled and written in the background."""
     if request.method == 'POST':
-        name = request.POST.get('name')
-        email = request.POST.get('email')
-        phone = request.POST.get('phone')
-        subject = request.POST.get('subject')
-        message = request.POST.get('message')
-
-        # Save message to the database
-        ContactMessage.objects.create(
-            name=name,
-            email=email,
-            phone=phone,
-            subject=subject,
-            message=message
-        )
-
-        messages.success(request, "Thank you! Your message has been sent successfully.")
+        form = ContactMessageForm(request.POST)
+        if form.is_valid():
+            get_writer(ContactMessage).submit(form.save(commit=False))
+            messages.success(request, "Thank you! Your message has been sent successfully.")
+        else:
+            messages.error(request, "Please fill in every field with valid details and try again.")
         return redirect('contact_page')
     return redirect('contact_page')
 
 # ============================ News Views ============================
 
+@cache_public_page(News)
 def news_list(request):
     """Display list of news articles."""
-    images = GalleryImage.objects.all()
-    news = News.objects.all().order_by('-date')
-    return render(request, 'gcms_sitehub/news.html', {'news': news, 'images': images})
+    news = CursorPaginator(News.objects.all(), ('-date', 'id'), 9).get_page(request.GET.get('cursor'))
+    return render(request, 'gcms_sitehub/news.html', {'news': news})
 
+@cache_public_page(News)
+@conditional_page(News, 'slug')
 def news_detail(request, slug):
     """Display detail of a specific news item."""
     news_item = get_object_or_404(News, slug=slug)
-    images = GalleryImage.objects.all()
-    return render(request, 'gcms_sitehub/news_detail.html', {'news_item': news_item, 'images': images})
+    return render(request, 'gcms_sitehub/news_detail.html', {'news_item': news_item})
 
 # ============================ Gallery View ============================
 
+@cache_public_page()
 def gallery_view(request):
     """Render gallery page with all images."""
     images = GalleryImage.objects.all()
     return render(request, 'gcms_sitehub/gallery.html', {'images': images})
 
+@cache_public_page(Course)
 def course_list(request):
     courses = Course.objects.all()
     return render(request, 'gcms_sitehub/course_list.html', {'courses': courses})
 
+@cache_public_page(Course)
+@conditional_page(Course, 'slug')
 def course_detail(request, slug):
     course = get_object_or_404(Course, slug=slug)
     return render(request, 'gcms_sitehub/course_detail.html', {'course': course})
 
+
+
+# ============================ Media Files ============================
+
+def serve_media(request, path, document_root=None):
+    """Development media server that marks content-addressed files as immutable."""
+    response = static_serve(request, path, document_root=document_root)
+    if is_content_addressed(path):
+        response['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return response
+
+# ============================ File Downloads ============================
+
+# URL kind -> (model, file field, lookup naming the download).
+DOWNLOADS = {
+    'application-form': (ApplicationDownload, 'form_file', 'intake_season'),
+    'exam-schedule': (Exam, 'schedule_file', 'title'),
+    'exam-result': (ExamResult, 'result_file', 'exam__title'),
+}
+
+@require_safe
+def download_file(request, kind, pk):
+    """Deliver an admission form, exam schedule or result sheet with Range/ETag support."""
+    if kind not in DOWNLOADS:
+        raise Http404('Unknown download.')
+    model, field, label = DOWNLOADS[kind]
+    row = model.objects.filter(pk=pk).values_list(field, label).first()
+    if row is None or not row[0]:
+        raise Http404('No file has been uploaded.')
+    name, title = row
+    extension = name.rsplit('.', 1)[-1] if '.' in name.rsplit('/', 1)[-1] else 'bin'
+    try:
+        return serve_download(request, name, f'{slugify(title) or kind}-{kind}.{extension}')
+    except FileNotFoundError:
+        raise Http404('The file is missing from storage.')
@@ -0,0 +1,276 @@
+import atexit
+import glob
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.base import DeserializationError
+from django.db import DataError, IntegrityError, OperationalError, close_old_connections, connections, router
+
+from .caching import bump_model_version
+from .db import _is_locked, atomic_with_retry
+
+try:
+    import fcntl
+except ImportError:  # spool files need flock(); without it (Windows) rows are only held in memory
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Most rows inserted per transaction, and the longest (in seconds) a submission
+# waits for others to share its transaction.
+WRITER_BATCH_SIZE = 100
+WRITER_FLUSH_INTERVAL = 0.5
+
+# Seconds the interpreter waits at exit for queued rows to be written.
+WRITER_SHUTDOWN_TIMEOUT = 10
+
+_STOP = object()
+
+
+# ============================ Spool Files ============================
+
+def _spool_pattern(spool_dir, model):
+    return os.path.join(spool_dir, f'{model._meta.label_lower}-*.jsonl')
+
+
+def _read_spool(handle):
+    handle.seek(0)
+    for line in handle:
+        if not line.strip():
+            continue
+        try:
+            yield next(serializers.deserialize('json', line)).object
+        except DeserializationError:
+            # The process died halfway through writing this line.
+            logger.warning('Skipped an unreadable line in %s.', handle.name)
+
+
+def claim_stale_spools(spool_dir, model):
+    """
+    Yield ``(path, handle)`` for each spool of ``model`` whose writer is gone.
+
+    A live writer holds an exclusive flock() on its spool, which the OS drops
+    when the process dies, so a spool that can be locked has been abandoned.
+    The lock is kept while the caller replays and deletes it.
+    """
+    if fcntl is None:
+        return
+    for path in sorted(glob.glob(_spool_pattern(spool_dir, model))):
+        try:
+            handle = open(path, 'r+', encoding='utf-8')
+        except FileNotFoundError:
+            continue
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        with handle:
+            # Another process may have replayed and deleted it before the lock was ours.
+            if os.path.exists(path):
+                yield path, handle
+
+
+# ============================ Batch Writer ============================
+
+class BatchWriter:
+    """
+    Insert unsaved instances of ``model`` from a background thread, many per
+    transaction, so request threads hand a row over and respond at once.
+
+    Rows are written with ``bulk_create(ignore_conflicts=True)``: a row that
+    breaks a unique constraint, such as a resubmitted idempotency key, is
+    dropped by the database. Forms should turn away what they can foresee
+    being dropped, as OnlineApplicationForm does with repeat applications. bulk_create sends no post_save, so the model's
+    page-cache version is bumped after each batch. A batch that still finds the
+    database locked after atomic_with_retry's retries is logged and tried
+    again; a row the database rejects outright is logged and dropped. Any
+    other database error (a missing table, a full disk) is logged and the
+    batch is left in its spool for ``replay_submission_spools``.
+
+    With ``spool_dir`` set, each row is also appended and fsync()ed to a
+    per-writer spool file before ``submit`` returns, and the spool is emptied
+    whenever everything queued has been written. Spools left behind by a
+    crashed process are replayed when a writer starts (or by the
+    ``replay_submission_spools`` command); rows that did reach the database
+    are skipped by their unique idempotency key. Timestamps are model defaults
+    set when the instance is built, not ``auto_now_add``, so a row written
+    late still carries the time it was submitted.
+    """
+
+    def __init__(self, model, *, batch_size=WRITER_BATCH_SIZE, flush_interval=WRITER_FLUSH_INTERVAL,
+                 spool_dir=None):
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_dir = spool_dir if fcntl is not None else None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._spool = None
+        self._lock = threading.Lock()
+
+    def submit(self, instance):
+        """Queue ``instance`` for insertion (spooling it first, if enabled) and return."""
+        line = serializers.serialize('json', [instance]) + '\n' if self.spool_dir else None
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f'{self.model._meta.label} writer', daemon=True,
+                )
+                self._thread.start()
+            if line is not None:
+                spool = self._open_spool()
+                spool.write(line)
+                spool.flush()
+                os.fsync(spool.fileno())
+            # Queued in spool order, so whenever the queue drains the whole spool is written.
+            self._queue.put(instance)
+
+    def close(self, timeout=WRITER_SHUTDOWN_TIMEOUT):
+        """Write whatever is queued and stop the thread."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        with self._lock:
+            if self._spool is not None and self._queue.empty() and not (thread and thread.is_alive()):
+                # Everything spooled was written, so nothing needs replaying.
+                self._spool.close()
+                os.unlink(self._spool.name)
+                self._spool = None
+
+    def replay_stale_spools(self):
+        """Insert the rows of spools abandoned by dead processes; returns how many were replayed."""
+        if not self.spool_dir:
+            return 0
+        total = 0
+        for path, handle in claim_stale_spools(self.spool_dir, self.model):
+            rows = list(_read_spool(handle))
+            written = all([
+                self._write(rows[start:start + self.batch_size])
+                for start in range(0, len(rows), self.batch_size)
+            ])
+            if not written:
+                logger.warning('Left %s for a later replay.', path)
+                continue
+            os.unlink(path)
+            total += len(rows)
+            logger.info('Replayed %d %s from %s.', len(rows), self.model._meta.verbose_name_plural, path)
+        return total
+
+    # ---------------------------- Spool ----------------------------
+
+    def _open_spool(self):
+        if self._spool is None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            name = f'{self.model._meta.label_lower}-{uuid.uuid4().hex}.jsonl'
+            self._spool = open(os.path.join(self.spool_dir, name), 'a', encoding='utf-8')
+            fcntl.flock(self._spool, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return self._spool
+
+    def _release_spool(self):
+        with self._lock:
+            if self._spool is not None and self._queue.empty():
+                self._spool.truncate(0)
+
+    def _keep_spool(self):
+        """Leave the current spool, unwritten rows included, for a replay; the next row starts a new one."""
+        with self._lock:
+            if self._spool is not None:
+                # Closing drops the flock(), so the spool counts as abandoned.
+                self._spool.close()
+                logger.warning('Kept %s for replay_submission_spools.', self._spool.name)
+                self._spool = None
+
+    # ---------------------------- Writer Thread ----------------------------
+
+    def _run(self):
+        try:
+            try:
+                self.replay_stale_spools()
+            except Exception:
+                logger.exception('Could not replay spooled %s.', self.model._meta.verbose_name_plural)
+            stopping = False
+            while not stopping:
+                batch, stopping = self._collect()
+                if batch:
+                    if self._write(batch):
+                        self._release_spool()
+                    else:
+                        self._keep_spool()
+        finally:
+            connections.close_all()
+
+    def _collect(self):
+        """Wait for one row, then gather more until the batch is full or the interval ends."""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write(self, batch):
+        """Insert ``batch``; returns False if the database would not take it."""
+        using = router.db_for_write(self.model)
+        insert = atomic_with_retry(self.model.objects.bulk_create, using=using)
+        while True:
+            close_old_connections()
+            try:
+                insert(batch, ignore_conflicts=True)
+            except OperationalError as error:
+                if not _is_locked(error):
+                    logger.exception('Could not write %d %s.', len(batch), self.model._meta.verbose_name_plural)
+                    return False
+                logger.warning(
+                    'Could not write %d %s: %s; retrying.', len(batch), self.model._meta.verbose_name_plural, error,
+                )
+                time.sleep(self.flush_interval)
+                continue
+            except (DataError, IntegrityError):
+                # A row the database rejects for more than a conflict; keep the rest.
+                for instance in batch:
+                    try:
+                        insert([instance], ignore_conflicts=True)
+                    except (DataError, IntegrityError):
+                        logger.exception('Dropped an invalid %s.', self.model._meta.verbose_name)
+            bump_model_version(self.model)
+            return True
+
+
+# ============================ Registry ============================
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(model):
+    """The process-wide BatchWriter for ``model``, spooling to SUBMISSION_SPOOL_DIR if set."""
+    with _writers_lock:
+        if model not in _writers:
+            _writers[model] = BatchWriter(model, spool_dir=getattr(settings, 'SUBMISSION_SPOOL_DIR', None))
+        return _writers[model]
+
+
+@atexit.register
+def close_writers():
+    for writer in list(_writers.values()):
+        writer.close()